@@ -0,0 +1,66 @@
+import argparse
+import csv
+import os
+import statistics
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ocr"))
+from craft_text_detector import Craft
+
+IMAGE_DIR = os.path.join(PROJECT_ROOT, "OCR_test_documents")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def time_backend(backend: str, image_paths, repeats: int):
+    """
+    Returns {image name: median seconds of craftnet + refinenet per image}.
+    The first detection warms the backend up and is not counted.
+    """
+    craft = Craft(output_dir=None, backend=backend)
+    craft.detect_text(image_paths[0])
+
+    timings = {}
+    for image_path in image_paths:
+        samples = []
+        for _ in range(repeats):
+            times = craft.detect_text(image_path)["times"]
+            samples.append(times["craftnet_time"] + times["refinenet_time"])
+        timings[os.path.basename(image_path)] = statistics.median(samples)
+    return timings
+
+
+def benchmark(backends, repeats: int, output_csv: str):
+    image_paths = sorted(
+        os.path.join(IMAGE_DIR, name) for name in os.listdir(IMAGE_DIR)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+    results = {backend: time_backend(backend, image_paths, repeats) for backend in backends}
+
+    print(f"{'File':30s}" + "".join(f"{backend:>12s}" for backend in backends))
+    print("-" * (30 + 12 * len(backends)))
+    rows = []
+    for image_path in image_paths:
+        name = os.path.basename(image_path)
+        print(f"{name:30s}" + "".join(f"{results[backend][name]:>11.3f}s" for backend in backends))
+        rows.append([name] + [results[backend][name] for backend in backends])
+    totals = [sum(results[backend].values()) for backend in backends]
+    print(f"{'Total':30s}" + "".join(f"{total:>11.3f}s" for total in totals))
+
+    os.makedirs(os.path.dirname(output_csv), exist_ok=True)
+    with open(output_csv, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["File"] + list(backends))
+        writer.writerows(rows)
+        writer.writerow(["Total"] + totals)
+    print(f"Results saved to {output_csv}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare CRAFT inference latency of the torch and ONNX Runtime backends.")
+    parser.add_argument('--backends', nargs='+', default=["torch", "onnx"], choices=["torch", "onnx"])
+    parser.add_argument('--repeats', type=int, default=3, help="Detections per image; the median is reported")
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "craft_backends.csv"))
+    args = parser.parse_args()
+
+    benchmark(args.backends, args.repeats, args.output)
@@ -0,0 +1,63 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ocr"))
+import craft_text_detector.craft_utils as craft_utils
+from craft_reference import make_score_maps, reference_getPoly_core
+
+
+def load_maps(maps_dir: str):
+    """
+    Returns [(name, textmap, linkmap)] from .npz files holding recorded CRAFT
+    score maps (np.savez(path, textmap=score_text, linkmap=score_link)), or
+    synthetic page-sized maps when no directory is given.
+    """
+    if maps_dir is None:
+        return [(f"synthetic_{seed}", *make_score_maps(seed, shape=(720, 960), n_words=200)) for seed in range(2)]
+
+    maps = []
+    for path in sorted(glob.glob(os.path.join(maps_dir, "*.npz"))):
+        data = np.load(path)
+        maps.append((os.path.basename(path), data["textmap"], data["linkmap"]))
+    return maps
+
+
+def time_call(function, args, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function(*args)
+    return (time.perf_counter() - start) / repeats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-benchmark of getPoly_core against the original column-scan implementation.")
+    parser.add_argument('--maps', help="Directory of recorded score maps (.npz with textmap and linkmap)")
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Maps':28s} {'Polys':>6s} {'Original':>10s} {'Current':>10s} {'Speedup':>8s}")
+    print("-" * 66)
+    for name, textmap, linkmap in load_maps(args.maps):
+        boxes, labels, mapper = craft_utils.getDetBoxes_core(textmap, linkmap, 0.7, 0.4, 0.4)
+        poly_args = (boxes, labels, mapper, linkmap)
+
+        expected = reference_getPoly_core(*poly_args)
+        polys = craft_utils.getPoly_core(*poly_args)
+        same = all(
+            (a is None and b is None) or (a is not None and b is not None and np.array_equal(a, b))
+            for a, b in zip(polys, expected)
+        )
+        if not same:
+            print(f"{name}: polygons differ from the original implementation")
+            sys.exit(1)
+
+        original = time_call(reference_getPoly_core, poly_args, args.repeats)
+        current = time_call(craft_utils.getPoly_core, poly_args, args.repeats)
+        n_polys = sum(p is not None for p in polys)
+        print(f"{name:28s} {n_polys:>6d} {original * 1000:>8.1f}ms {current * 1000:>8.1f}ms {original / current:>7.1f}x")
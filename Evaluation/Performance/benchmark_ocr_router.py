@@ -0,0 +1,85 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+from jiwer import cer, wer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+from pipeline.pool import WorkerPool
+
+IMAGE_DIR = os.path.join(PROJECT_ROOT, "OCR_test_documents")
+GROUND_TRUTH_DIR = os.path.join(PROJECT_ROOT, "ocr_ground_truths")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+ENGINES = ("trocr", "tesseract", "auto")
+
+
+def read_ground_truth(image_path: str):
+    gt_path = os.path.join(GROUND_TRUTH_DIR, os.path.splitext(os.path.basename(image_path))[0] + ".txt")
+    if not os.path.isfile(gt_path):
+        return None
+    with open(gt_path, "r", encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and accuracy of each OCR engine, and of the printed/handwritten router, on OCR_test_documents.")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--csv', help="Also write one row per engine and image to this CSV file")
+    args = parser.parse_args()
+
+    image_paths = sorted(
+        os.path.join(IMAGE_DIR, name) for name in os.listdir(IMAGE_DIR)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+    # one warm OCR worker, so the timings cover recognition and not model loading
+    pool = WorkerPool({"ocr": 1})
+    rows = []
+    try:
+        pool.preload(["ocr"])
+        for engine in args.engines:
+            for image_path in image_paths:
+                start = time.time()
+                text = pool.run("ocr", image_path=image_path, engine=engine).strip()
+                seconds = time.time() - start
+                reference = read_ground_truth(image_path)
+                rows.append({
+                    "engine": engine,
+                    "image": os.path.basename(image_path),
+                    "seconds": seconds,
+                    "wer": wer(reference, text) if reference else None,
+                    "cer": cer(reference, text) if reference else None,
+                })
+    finally:
+        pool.close()
+
+    print(f"{'Engine':10s} {'Image':20s} {'Time':>8s} {'WER':>8s} {'CER':>8s}")
+    print("-" * 58)
+    for row in rows:
+        scores = f"{row['wer']:>8.2%} {row['cer']:>8.2%}" if row["wer"] is not None else f"{'-':>8s} {'-':>8s}"
+        print(f"{row['engine']:10s} {row['image']:20s} {row['seconds']:>7.2f}s {scores}")
+
+    print(f"\n{'Engine':10s} {'Pages':>6s} {'Total':>9s} {'Hand. CER':>10s} {'Print. CER':>11s}")
+    print("-" * 50)
+    for engine in args.engines:
+        engine_rows = [row for row in rows if row["engine"] == engine]
+        averages = []
+        for prefix in ("handwritten", "printed"):
+            cers = [row["cer"] for row in engine_rows if row["image"].startswith(prefix) and row["cer"] is not None]
+            averages.append(sum(cers) / len(cers) if cers else float("nan"))
+        total = sum(row["seconds"] for row in engine_rows)
+        print(f"{engine:10s} {len(engine_rows):>6d} {total:>8.1f}s {averages[0]:>10.2%} {averages[1]:>11.2%}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=["engine", "image", "seconds", "wer", "cer"])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\nResults written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tracemalloc
+
+import cv2
+from PIL import Image
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ocr"))
+from craft_text_detector import image_utils
+
+IMAGE_DIR = os.path.join(PROJECT_ROOT, "OCR_test_documents")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+LONG_SIZE = 1280
+
+
+def line_boxes(image, n_lines=20):
+    """
+    Stand-in for CRAFT line boxes: full-width horizontal bands.
+    """
+    h, w = image.shape[:2]
+    step = h // n_lines
+    return [(0, y, w, y + step // 2) for y in range(0, h - step, step)]
+
+
+def legacy_handoff(image_path):
+    """
+    The image hand-off of run_ocr before the zero-copy change: decoded twice,
+    normalized on a copy, and converted to a full-page PIL image for cropping.
+    """
+    image = cv2.imread(image_path)
+    craft_image = image_utils.read_image(image_path)
+    img_resized, _, _ = image_utils.resize_aspect_ratio(craft_image, LONG_SIZE, interpolation=cv2.INTER_LINEAR)
+    # the old normalizeMeanVariance: in_img.copy().astype(np.float32)
+    x = image_utils.normalizeMeanVariance(img_resized.copy())
+    pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+    return x, [pil_image.crop(box) for box in line_boxes(image)]
+
+
+def zero_copy_handoff(image_path):
+    """
+    The current hand-off: one decode converted to RGB in place, in-place
+    normalization of the resized canvas, and crops cut from views of the page.
+    """
+    image = cv2.imread(image_path)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+    craft_image = image_utils.read_image(image)
+    img_resized, _, _ = image_utils.resize_aspect_ratio(craft_image, LONG_SIZE, interpolation=cv2.INTER_LINEAR)
+    x = image_utils.normalizeMeanVariance(img_resized, copy=False)
+    return x, [Image.fromarray(image[y0:y1, x0:x1]) for x0, y0, x1, y1 in line_boxes(image)]
+
+
+def peak_mb(handoff, image_path):
+    tracemalloc.start()
+    result = handoff(image_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 1024 ** 2
+
+
+if __name__ == "__main__":
+    image_paths = sorted(
+        os.path.join(IMAGE_DIR, name) for name in os.listdir(IMAGE_DIR)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+    print(f"{'File':24s} {'Legacy':>10s} {'Zero-copy':>10s} {'Saved':>8s}")
+    print("-" * 56)
+    totals = [0.0, 0.0]
+    for image_path in image_paths:
+        legacy = peak_mb(legacy_handoff, image_path)
+        zero_copy = peak_mb(zero_copy_handoff, image_path)
+        totals[0] += legacy
+        totals[1] += zero_copy
+        print(f"{os.path.basename(image_path):24s} {legacy:>8.1f}MB {zero_copy:>8.1f}MB {1 - zero_copy / legacy:>7.0%}")
+    n = len(image_paths)
+    print(f"{'Mean per page':24s} {totals[0] / n:>8.1f}MB {totals[1] / n:>8.1f}MB {1 - totals[1] / totals[0]:>7.0%}")
@@ -0,0 +1,101 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from jiwer import cer, wer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+IMAGE_DIR = os.path.join(PROJECT_ROOT, "OCR_test_documents")
+GROUND_TRUTH_DIR = os.path.join(PROJECT_ROOT, "ocr_ground_truths")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+OCR_SCRIPT = os.path.join(PROJECT_ROOT, "ocr", "trocr_craft.py")
+CALIBRATION_SOURCES = os.path.join(PROJECT_ROOT, "OCR_calibration_documents", "SOURCES.txt")
+
+
+def calibration_sources():
+    """
+    Returns the absolute paths of the documents int8 CraftNet was calibrated
+    on, as listed in OCR_calibration_documents/SOURCES.txt.
+    """
+    sources = set()
+    if os.path.isfile(CALIBRATION_SOURCES):
+        with open(CALIBRATION_SOURCES, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    source = line.split("\t")[1].split("#", 1)[0]
+                    sources.add(os.path.normpath(os.path.join(PROJECT_ROOT, source)))
+    return sources
+
+
+def run_ocr(image_paths, quantize: bool, work_dir: str) -> float:
+    """
+    OCRs the images in a fresh trocr_craft.py process (models are configured
+    at import time) and returns the elapsed seconds. Texts land in
+    <work_dir>/step_outputs/OCR_outputs. Every page goes through CRAFT +
+    TrOCR, since the router would send printed pages to Tesseract.
+    """
+    env = dict(os.environ, OCR_QUANTIZE="1" if quantize else "0", OCR_ENGINE="trocr")
+    start = time.time()
+    subprocess.run([sys.executable, OCR_SCRIPT] + image_paths, cwd=work_dir, env=env,
+                   stdout=subprocess.DEVNULL, check=True)
+    return time.time() - start
+
+
+def score(ocr_dir: str):
+    """
+    Returns (average WER, average CER) against ocr_ground_truths.
+    """
+    wers, cers = [], []
+    for filename in sorted(os.listdir(ocr_dir)):
+        gt_path = os.path.join(GROUND_TRUTH_DIR, filename)
+        if not os.path.isfile(gt_path):
+            continue
+        with open(gt_path, "r", encoding="utf-8") as f:
+            reference = f.read().strip()
+        with open(os.path.join(ocr_dir, filename), "r", encoding="utf-8") as f:
+            hypothesis = f.read().strip()
+        wers.append(wer(reference, hypothesis))
+        cers.append(cer(reference, hypothesis))
+    if not wers:
+        raise RuntimeError(f"No OCR outputs in {ocr_dir} match a ground truth file.")
+    return sum(wers) / len(wers), sum(cers) / len(cers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy gate for OCR_QUANTIZE=1: compares int8 and float32 TrOCR + CRAFT on OCR_test_documents.")
+    parser.add_argument('--max-wer-increase', type=float, default=0.02, help="Allowed absolute increase of the average WER")
+    parser.add_argument('--max-cer-increase', type=float, default=0.01, help="Allowed absolute increase of the average CER")
+    args = parser.parse_args()
+
+    # pages the quantized model was calibrated on would flatter it
+    excluded = calibration_sources()
+    image_paths = sorted(
+        os.path.join(IMAGE_DIR, name) for name in os.listdir(IMAGE_DIR)
+        if name.lower().endswith(IMAGE_EXTENSIONS) and os.path.normpath(os.path.join(IMAGE_DIR, name)) not in excluded
+    )
+
+    results = {}
+    for quantize in (False, True):
+        with tempfile.TemporaryDirectory() as work_dir:
+            elapsed = run_ocr(image_paths, quantize, work_dir)
+            results[quantize] = score(os.path.join(work_dir, "step_outputs", "OCR_outputs")) + (elapsed,)
+
+    print(f"{'Mode':10s} {'WER':>8s} {'CER':>8s} {'Time':>9s}")
+    print("-" * 38)
+    for quantize, (avg_wer, avg_cer, elapsed) in results.items():
+        print(f"{'int8' if quantize else 'float32':10s} {avg_wer:>8.2%} {avg_cer:>8.2%} {elapsed:>8.1f}s")
+
+    float_wer, float_cer, _ = results[False]
+    int8_wer, int8_cer, _ = results[True]
+    if int8_wer - float_wer > args.max_wer_increase or int8_cer - float_cer > args.max_cer_increase:
+        print("FAIL: quantized OCR loses too much accuracy; keep OCR_QUANTIZE off.")
+        sys.exit(1)
+    print("PASS: quantized OCR is within the accuracy budget.")
+
+
+if __name__ == "__main__":
+    main()
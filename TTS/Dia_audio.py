@@ -1,36 +1,115 @@
 import soundfile as sf
+import torch
 from dia.model import Dia
 import os
 import sys
 import argparse
+import tempfile
 
-dia_model = None
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from chunked_synthesis import SPEAKER_TAG, crossfade_concat, split_script, synthesize_chunks
+from tts_config import TTS_CONFIG
+
+DIA_CONFIG = TTS_CONFIG["dia"]
+
+# number of model replicas synthesizing chunks in parallel
+TTS_WORKERS = max(1, int(os.environ.get("TTS_WORKERS", 1)))
+
+dia_models = []
 try:
-    dia_model = Dia.from_pretrained("nari-labs/Dia-1.6B-0626", compute_dtype="float16")
+    dia_models = [
+        Dia.from_pretrained(DIA_CONFIG["model_id"], compute_dtype=DIA_CONFIG["compute_dtype"])
+        for _ in range(TTS_WORKERS)
+    ]
 except Exception as e:
     print(f"[ERROR] Dia model could not be loaded: {e}", file=sys.stderr)
+dia_model = dia_models[0] if dia_models else None
+
+def voice_prompt_text(chunks) -> str:
+    """
+    The opening words of each speaker's first chunk, in order of appearance.
+    """
+    openings = {}
+    for chunk in chunks:
+        tag = SPEAKER_TAG.match(chunk).group(1)
+        if tag not in openings:
+            openings[tag] = split_script(chunk, max_chars=DIA_CONFIG["voice_prompt_chars"], speaker_tags=True)[0]
+    return " ".join(openings.values())
+
 
-def synthesize_dia_audio(text: str, output_filepath: str) -> str:
+def _load_voice_prompt(voice_prompt: str, chunks) -> str:
+    """
+    Returns the transcript of the voice prompt WAV at voice_prompt (stored
+    next to it as .txt), generating both from chunks on first use. Unprompted
+    Dia calls pick a random voice, so the prompt is made with a fixed seed.
+    """
+    transcript_path = os.path.splitext(voice_prompt)[0] + ".txt"
+    if os.path.isfile(voice_prompt) and os.path.isfile(transcript_path):
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    prompt_text = voice_prompt_text(chunks)
+    torch.manual_seed(DIA_CONFIG["seed"])
+    audio = dia_model.generate(prompt_text)
+    sf.write(voice_prompt, audio, DIA_CONFIG["sample_rate"])
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write(prompt_text)
+    return prompt_text
+
+
+def synthesize_dia_audio(text: str, output_filepath: str, voice_prompt: str = None) -> str:
+    """
+    Arguments:
+        voice_prompt: WAV path of a voice prompt shared across calls (the
+            --stream segments of one lecture). Created from this text if it
+            does not exist yet; without it a prompt is made for this call only.
+    """
     if dia_model is None:
         return "[ERROR] Dia model not loaded. Cannot synthesize audio."
 
     try:
         os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        audio = dia_model.generate(text)
-        sf.write(output_filepath, audio, 44100)
+        chunks = split_script(text, max_chars=DIA_CONFIG["max_chunk_chars"], speaker_tags=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prompt_path = voice_prompt or os.path.join(tmp_dir, "voice_prompt.wav")
+            prompt_text = _load_voice_prompt(prompt_path, chunks)
+            # Dia continues the prompt audio, so its transcript goes before the chunk
+            segments = synthesize_chunks(chunks, [
+                lambda chunk, model=model: model.generate(f"{prompt_text} {chunk}", audio_prompt=prompt_path)
+                for model in dia_models
+            ])
+        audio = crossfade_concat(segments, DIA_CONFIG["sample_rate"], DIA_CONFIG["crossfade_ms"])
+        sf.write(output_filepath, audio, DIA_CONFIG["sample_rate"])
         return output_filepath
     except Exception as e:
         return f"[ERROR] Failed to synthesize audio with Dia: {e}"
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Dia TTS audio generation.")
-    parser.add_argument('--text', required=True, help="The text to convert to speech.")
-    parser.add_argument('--output', required=True, help="The full path to the output .wav file.")
+    parser.add_argument('--text', help="The text to convert to speech.")
+    parser.add_argument('--text-file', help="Read the text from this file instead ('-' reads stdin).")
+    parser.add_argument('--output', help="The full path to the output .wav file.")
+    parser.add_argument('--voice-prompt', help="Voice prompt WAV shared across calls; created on first use.")
+    parser.add_argument('--serve', action='store_true', help="Keep the model loaded and serve requests on stdin/stdout.")
     args = parser.parse_args()
 
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pipeline.worker import read_text, serve
+
+    if args.serve:
+        serve(lambda text, output, voice_prompt=None: synthesize_dia_audio(
+            text=text, output_filepath=output, voice_prompt=voice_prompt
+        ))
+        sys.exit(0)
+    if args.text_file is not None:
+        args.text = read_text(args.text_file)
+    if args.text is None or args.output is None:
+        parser.error("--text (or --text-file) and --output are required unless --serve is given.")
+
     saved_path = synthesize_dia_audio(
         text=args.text,
-        output_filepath=args.output
+        output_filepath=args.output,
+        voice_prompt=args.voice_prompt
     )
 
     if "[ERROR]" in saved_path:
@@ -1,14 +1,25 @@
+import torch
 import torchaudio
 from chatterbox.tts import ChatterboxTTS
 import os
 import argparse
 import sys
 
-chatterbox_model = None
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from chunked_synthesis import crossfade_concat, split_script, synthesize_chunks
+from tts_config import TTS_CONFIG
+
+CHATTERBOX_CONFIG = TTS_CONFIG["chatterbox"]
+
+# number of model replicas synthesizing chunks in parallel
+TTS_WORKERS = max(1, int(os.environ.get("TTS_WORKERS", 1)))
+
+chatterbox_models = []
 try:
-    chatterbox_model = ChatterboxTTS.from_pretrained(device="cuda")
+    chatterbox_models = [ChatterboxTTS.from_pretrained(device="cuda") for _ in range(TTS_WORKERS)]
 except Exception as e:
     print(f"[ERROR] Chatterbox model could not be loaded: {e}", file=sys.stderr)
+chatterbox_model = chatterbox_models[0] if chatterbox_models else None
 
 def synthesize_chatterbox_audio(text: str, output_filepath: str) -> str:
     if chatterbox_model is None:
@@ -16,18 +27,36 @@ def synthesize_chatterbox_audio(text: str, output_filepath: str) -> str:
 
     try:
         os.makedirs(os.path.dirname(output_filepath), exist_ok=True)
-        audio = chatterbox_model.generate(text)
-        torchaudio.save(output_filepath, audio, chatterbox_model.sr)
+        chunks = split_script(text, max_chars=CHATTERBOX_CONFIG["max_chunk_chars"])
+        segments = synthesize_chunks(
+            chunks,
+            [lambda chunk, m=m: m.generate(chunk).squeeze(0).cpu().numpy() for m in chatterbox_models]
+        )
+        audio = crossfade_concat(segments, chatterbox_model.sr, CHATTERBOX_CONFIG["crossfade_ms"])
+        torchaudio.save(output_filepath, torch.from_numpy(audio).unsqueeze(0), chatterbox_model.sr)
         return output_filepath
     except Exception as e:
         return f"[ERROR] Failed to synthesize audio with Chatterbox: {e}"
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Chatterbox TTS audio generation.")
-    parser.add_argument('--text', required=True, help="The text to convert to speech.")
-    parser.add_argument('--output', required=True, help="The full path to the output .wav file.")
+    parser.add_argument('--text', help="The text to convert to speech.")
+    parser.add_argument('--text-file', help="Read the text from this file instead ('-' reads stdin).")
+    parser.add_argument('--output', help="The full path to the output .wav file.")
+    parser.add_argument('--serve', action='store_true', help="Keep the model loaded and serve requests on stdin/stdout.")
     args = parser.parse_args()
 
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pipeline.worker import read_text, serve
+
+    if args.serve:
+        serve(lambda text, output: synthesize_chatterbox_audio(text=text, output_filepath=output))
+        sys.exit(0)
+    if args.text_file is not None:
+        args.text = read_text(args.text_file)
+    if args.text is None or args.output is None:
+        parser.error("--text (or --text-file) and --output are required unless --serve is given.")
+
     saved_path = synthesize_chatterbox_audio(
         text=args.text,
         output_filepath=args.output
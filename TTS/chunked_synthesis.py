@@ -0,0 +1,125 @@
+import queue
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_MAX_CHARS = 300
+DEFAULT_CROSSFADE_MS = 30
+DEFAULT_SPEAKER_TAG = "[S1]"
+
+SPEAKER_TAG = re.compile(r'(\[S\d+\])')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def _split_long(sentence: str, max_chars: int):
+    """
+    Breaks a sentence longer than max_chars at word boundaries.
+    """
+    pieces = []
+    current = ""
+    for word in sentence.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _speaker_turns(text: str, speaker_tags: bool):
+    if not speaker_tags:
+        return [(None, text)]
+
+    turns = []
+    tag = DEFAULT_SPEAKER_TAG
+    for part in SPEAKER_TAG.split(text):
+        if SPEAKER_TAG.fullmatch(part):
+            tag = part
+        elif part.strip():
+            turns.append((tag, part))
+    return turns
+
+
+def split_script(text: str, max_chars: int = DEFAULT_MAX_CHARS, speaker_tags: bool = False):
+    """
+    Splits a lecture script into chunks of whole sentences of at most max_chars.
+    With speaker_tags (Dia), a chunk never spans two [S1]/[S2] turns and always
+    starts with the tag of its turn.
+    """
+    chunks = []
+    for tag, body in _speaker_turns(text, speaker_tags):
+        sentences = []
+        for sentence in SENTENCE_BOUNDARY.split(body.strip()):
+            if len(sentence) > max_chars:
+                sentences.extend(_split_long(sentence, max_chars))
+            elif sentence:
+                sentences.append(sentence)
+
+        turn_chunks = []
+        current = ""
+        for sentence in sentences:
+            if current and len(current) + 1 + len(sentence) > max_chars:
+                turn_chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            turn_chunks.append(current)
+
+        if tag is not None:
+            turn_chunks = [f"{tag} {chunk}" for chunk in turn_chunks]
+        chunks.extend(turn_chunks)
+    return chunks
+
+
+def synthesize_chunks(chunks, generators):
+    """
+    Synthesizes chunks in parallel and returns the audio arrays in chunk order.
+
+    Arguments:
+        chunks: list of text chunks
+        generators: one callable per loaded model replica, text -> 1-D float array.
+            Each replica serves one chunk at a time, so len(generators) is the
+            degree of parallelism.
+    """
+    replicas = queue.Queue()
+    for generate in generators:
+        replicas.put(generate)
+
+    def run(chunk):
+        generate = replicas.get()
+        try:
+            return np.asarray(generate(chunk), dtype=np.float32).reshape(-1)
+        finally:
+            replicas.put(generate)
+
+    with ThreadPoolExecutor(max_workers=len(generators)) as executor:
+        return list(executor.map(run, chunks))
+
+
+def crossfade_concat(segments, sample_rate: int, crossfade_ms: int = DEFAULT_CROSSFADE_MS):
+    """
+    Joins audio segments, overlapping consecutive ones by a short linear
+    crossfade to hide clicks at chunk boundaries.
+    """
+    if not segments:
+        return np.zeros(0, dtype=np.float32)
+
+    fade_len = int(sample_rate * crossfade_ms / 1000)
+    pieces = []
+    tail = segments[0]
+    for segment in segments[1:]:
+        k = min(fade_len, len(tail), len(segment))
+        if k == 0:
+            pieces.append(tail)
+            tail = segment
+            continue
+        fade_in = np.linspace(0.0, 1.0, k, dtype=np.float32)
+        pieces.append(tail[:-k])
+        pieces.append(tail[-k:] * (1.0 - fade_in) + segment[:k] * fade_in)
+        tail = segment[k:]
+    pieces.append(tail)
+    return np.concatenate(pieces)
@@ -4,11 +4,15 @@ import sys
 from elevenlabs.client import ElevenLabs
 from dotenv import load_dotenv
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from tts_config import TTS_CONFIG
+
 load_dotenv()
 
-DEFAULT_VOICE_ID = "EXAVITQu4vr4xnSDxMaL"
+ELEVENLABS_CONFIG = TTS_CONFIG["elevenlabs_v2"]
+DEFAULT_VOICE_ID = ELEVENLABS_CONFIG["voice_id"]
 
-def synthesize_audio(text: str, voice_id: str, output_path: str, model_id: str = "eleven_multilingual_v2") -> None:
+def synthesize_audio(text: str, voice_id: str, output_path: str, model_id: str = ELEVENLABS_CONFIG["model_id"]) -> None:
     api_key = os.getenv("ELEVENLABS_API_KEY")
     if not api_key:
         raise ValueError("ELEVENLABS_API_KEY environment variable is not set.")
@@ -20,7 +24,7 @@ def synthesize_audio(text: str, voice_id: str, output_path: str, model_id: str =
             text=text,
             voice_id=voice_id,
             model_id=model_id,
-            output_format="mp3_44100_128",
+            output_format=ELEVENLABS_CONFIG["output_format"],
         )
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
@@ -35,11 +39,29 @@ def synthesize_audio(text: str, voice_id: str, output_path: str, model_id: str =
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="ElevenLabs TTS audio generation.")
-    parser.add_argument('--text', required=True, help="The text to convert to speech.")
-    parser.add_argument('--output', required=True, help="The full path to the output .mp3 file.")
+    parser.add_argument('--text', help="The text to convert to speech.")
+    parser.add_argument('--text-file', help="Read the text from this file instead ('-' reads stdin).")
+    parser.add_argument('--output', help="The full path to the output .mp3 file.")
     parser.add_argument('--voice_id', default=DEFAULT_VOICE_ID, help="The ElevenLabs voice ID to use.")
+    parser.add_argument('--serve', action='store_true', help="Serve synthesis requests on stdin/stdout.")
     args = parser.parse_args()
 
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pipeline.worker import read_text, serve
+
+    if args.serve:
+
+        def handle(text, output):
+            synthesize_audio(text=text, voice_id=args.voice_id, output_path=output)
+            return output
+
+        serve(handle)
+        sys.exit(0)
+    if args.text_file is not None:
+        args.text = read_text(args.text_file)
+    if args.text is None or args.output is None:
+        parser.error("--text (or --text-file) and --output are required unless --serve is given.")
+
     try:
         synthesize_audio(
             text=args.text,
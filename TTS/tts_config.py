@@ -0,0 +1,25 @@
+# Engine settings that change the synthesized audio.
+
+TTS_CONFIG = {
+    "chatterbox": {
+        "max_chunk_chars": 300,
+        "crossfade_ms": 30,
+    },
+    "elevenlabs_v2": {
+        "voice_id": "EXAVITQu4vr4xnSDxMaL",
+        "model_id": "eleven_multilingual_v2",
+        "output_format": "mp3_44100_128",
+    },
+    "dia": {
+        "model_id": "nari-labs/Dia-1.6B-0626",
+        "compute_dtype": "float16",
+        "sample_rate": 44100,
+        "max_chunk_chars": 300,
+        "crossfade_ms": 30,
+        # every chunk is generated with the same voice prompt: a short seeded
+        # clip with the first words of each speaker, so [S1]/[S2] keep their
+        # voices across the lecture
+        "seed": 42,
+        "voice_prompt_chars": 150,
+    },
+}
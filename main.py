@@ -2,148 +2,178 @@ import argparse
 import logging
 import os
 import sys
-import subprocess
-from ocr.pdf_parser import analyze_and_save
+# the stage *_config modules import nothing heavy, so the settings the result
+# cache keys cover are read here without loading torch or the TTS engines
+from nlp.nlp_config import CHUNK_TOKENS, CONTEXT_TOKENS
+from nlp.system_prompts import SYSTEM_PROMPTS_MAP
+from ocr.ocr_config import (CRAFT_CONFIG, OCR_ENGINE, OCR_ENGINES, PRINTED_THRESHOLD, QUANTIZE, TROCR_GENERATION_CONFIG,
+                            TROCR_MIN_CONFIDENCE, TROCR_MODEL_ID)
+from ocr.pdf_parser import DEFAULT_OCR_WORKERS, RENDER_DPI, analyze_and_save
+from pipeline.batch import StagedPipeline
+from pipeline.cache import DEFAULT_MAX_BYTES, ResultCache, cache_key, file_digest, text_digest
+from pipeline.pool import WorkerPool
+from pipeline.stages import PROJECT_ROOT, StageError, SubprocessRunner
+from pipeline.streaming import stream_lecture_segments, synthesize_segments
+from TTS.tts_config import TTS_CONFIG
 
-def main():
-    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
-
-    parser = argparse.ArgumentParser(description="Lecture Synthesizer: Convert document to lecture audio.")
-    parser.add_argument('--input', '-i', required=True, help="Path to the input file (PDF or image)")
-    parser.add_argument('--tts', '-t', required=True, choices=['chatterbox', 'elevenlabs_v2', 'dia'],
-                        help="TTS engine to use: 'chatterbox', 'elevenlabs_v2', or 'dia'")
-    args = parser.parse_args()
+OLLAMA_MODEL_NAME = "llama3:8b"
 
-    input_path = args.input
-    tts_engine = args.tts
 
-    if not os.path.isfile(input_path):
-        logging.error(f"Input file not found: {input_path}")
-        sys.exit(1)
+def extract_pdf_text(input_path: str, runner, ocr_workers: int, ocr_engine: str = OCR_ENGINE) -> str:
+    logging.info("Input is a PDF. Extracting text using PDF parser (OCR for scanned pages)...")
+    # scanned pages are recognized in parallel by warm OCR workers rather
+    # than one cold-started OCR process per page
+    page_runner = WorkerPool({"ocr": ocr_workers}) if isinstance(runner, SubprocessRunner) else runner
+    try:
+        return analyze_and_save(
+            input_path,
+            ocr_image=lambda image_path: page_runner.run("ocr", image_path=image_path, engine=ocr_engine,
+                                                          quantize=QUANTIZE),
+            max_workers=ocr_workers
+        )
+    except StageError:
+        raise
+    except Exception as e:
+        raise StageError(f"Failed to extract text from PDF: {e}")
+    finally:
+        if page_runner is not runner:
+            page_runner.close()
 
-    ext = os.path.splitext(input_path)[1].lower()
-    is_pdf = ext == '.pdf'
-    is_image = ext in ['.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp']
-    if not is_pdf and not is_image:
-        logging.error("Unsupported file type. Please provide a PDF or image file as input.")
-        sys.exit(1)
 
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = script_dir
+def extract_text(input_path: str, is_pdf: bool, runner, ocr_workers: int = DEFAULT_OCR_WORKERS,
+                 ocr_engine: str = OCR_ENGINE) -> str:
+    if is_pdf:
+        return extract_pdf_text(input_path, runner, ocr_workers, ocr_engine)
 
-    if sys.platform == "win32":
-        ocr_env_python = os.path.join(project_root, '.venv_ocr_craft', 'Scripts', 'python.exe')
-        ollama_env_python = os.path.join(project_root, '.venv_ollama', 'Scripts', 'python.exe')
-        chatter_env_python = os.path.join(project_root, '.venv_chatter', 'Scripts', 'python.exe')
-        elevenlabs_env_python = os.path.join(project_root, '.venv_elevenlabs', 'Scripts', 'python.exe')
-        dia_env_python = os.path.join(project_root, '.venv_dia', 'Scripts', 'python.exe')
-    else:
-        ocr_env_python = os.path.join(project_root, '.venv_ocr_craft', 'bin', 'python')
-        ollama_env_python = os.path.join(project_root, '.venv_ollama', 'bin', 'python')
-        chatter_env_python = os.path.join(project_root, '.venv_chatter', 'bin', 'python')
-        elevenlabs_env_python = os.path.join(project_root, '.venv_elevenlabs', 'bin', 'python')
-        dia_env_python = os.path.join(project_root, '.venv_dia', 'bin', 'python')
-
-    trocr_script = os.path.join(project_root, 'ocr', 'trocr_craft.py')
-    generate_lecture_script = os.path.join(project_root, 'nlp', 'nlp_model.py')
-    chatterbox_script = os.path.join(project_root, 'TTS', 'chatterbox_audio.py')
-    elevenlabs_script = os.path.join(project_root, 'TTS', 'elevenlabs_audio.py')
-    dia_script = os.path.join(project_root, 'TTS', 'Dia_audio.py')
-
-    nlp_output_dir = os.path.join(project_root, 'step_outputs', 'llm_outputs')
-    final_output_dir = os.path.join(project_root, 'Final_Output')
-    os.makedirs(nlp_output_dir, exist_ok=True)
-    os.makedirs(final_output_dir, exist_ok=True)
+    logging.info(f"Input is an image. Extracting text using OCR (engine: {ocr_engine})...")
+    return runner.run("ocr", image_path=os.path.abspath(input_path), engine=ocr_engine, quantize=QUANTIZE).strip()
 
-    logging.info(f"Processing input file: {input_path}")
-    text_content = ""
 
-    if is_pdf:
-        logging.info("Input is a PDF. Extracting text using PDF parser...")
-        try:
-            text_content = analyze_and_save(input_path)
-        except Exception as e:
-            logging.error(f"Failed to extract text from PDF: {e}")
-            sys.exit(1)
-    elif is_image:
-        logging.info("Input is an image. Extracting text using OCR (TrOCR + CRAFT)...")
-        if not os.path.exists(ocr_env_python):
-            logging.error(f"OCR Python executable not found at '{ocr_env_python}'. Please ensure .venv_trocr is set up.")
-            sys.exit(1)
-        if not os.path.exists(trocr_script):
-            logging.error(f"OCR script not found at '{trocr_script}'. Please ensure trocr_craft.py exists.")
-            sys.exit(1)
-        try:
-            result = subprocess.run(
-                [ocr_env_python, trocr_script, input_path],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            text_content = result.stdout.strip()
-            if result.stderr:
-                logging.info(f"OCR Subprocess Stderr: {result.stderr.strip()}")
-        except FileNotFoundError as e:
-            logging.error(f"OCR execution failed: {e}. Ensure OCR virtual environment and script exist.")
-            sys.exit(1)
-        except subprocess.CalledProcessError as e:
-            logging.error(f"OCR script returned error code {e.returncode}. Stderr: {e.stderr.strip()}")
-            sys.exit(1)
-        except Exception as e:
-            logging.error(f"An unexpected error occurred during OCR subprocess execution: {e}")
-            sys.exit(1)
-    else:
-        logging.error("Unknown input file type.")
-        sys.exit(1)
+def generate_lecture(text_content: str, system_prompt_type: str, runner) -> str:
+    logging.info(f"Generating lecture script using NLP model (Ollama {OLLAMA_MODEL_NAME})...")
+    lecture_script = runner.run(
+        "llm",
+        notes=text_content,
+        ollama_model_name=OLLAMA_MODEL_NAME,
+        system_prompt_type=system_prompt_type,
+        max_chunk_tokens=CHUNK_TOKENS
+    ).strip()
 
-    if not text_content:
-        logging.error("No text was extracted from the input file. Exiting.")
-        sys.exit(1)
+    if "[ERROR]" in lecture_script:
+        raise StageError(f"Lecture generation failed: {lecture_script}")
+    logging.info("Lecture script generation completed.")
+    return lecture_script
 
-    logging.info(f"Extracted text length: {len(text_content)} characters.")
 
-    logging.info("Generating lecture script using NLP model (Ollama llama3:8b)...")
-    ollama_model_name = "llama3:8b"
-    system_prompt_type = tts_engine
-    
-    if not os.path.exists(ollama_env_python):
-        logging.error(f"Ollama client Python executable not found at '{ollama_env_python}'. Please ensure .venv_ollama is set up.")
-        sys.exit(1)
-    if not os.path.exists(generate_lecture_script):
-        logging.error(f"Lecture generation script not found at '{generate_lecture_script}'. Please ensure generate_lecture.py exists.")
-        sys.exit(1)
+def synthesize_lecture(lecture_script: str, tts_engine: str, final_audio_path: str, runner) -> None:
+    logging.info(f"Converting lecture script to speech using TTS engine: {tts_engine}")
+    runner.run(tts_engine, text=lecture_script, output=final_audio_path)
 
-    try:
-        result = subprocess.run(
-            [ollama_env_python, generate_lecture_script, text_content, ollama_model_name, system_prompt_type],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            check=True
-        )
-        lecture_script = result.stdout.strip()
-        if result.stderr:
-            logging.info(f"NLP Subprocess Stderr: {result.stderr.strip()}")
 
-        if "[ERROR]" in lecture_script:
-            logging.error(f"Lecture generation failed: {lecture_script}")
-            sys.exit(1)
-            
-    except FileNotFoundError as e:
-        logging.error(f"NLP model generation failed: {e}. Ensure Ollama client virtual environment and script exist.")
-        sys.exit(1)
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Ollama script returned error code {e.returncode}. Stderr: {e.stderr.strip()}")
-        sys.exit(1)
-    except Exception as e:
-        logging.error(f"An unexpected error occurred during NLP model generation: {e}")
-        sys.exit(1)
-    
+def stream_lecture(text_content: str, tts_engine: str, final_audio_path: str, runner) -> str:
+    logging.info(f"Streaming lecture script from Ollama {OLLAMA_MODEL_NAME} into TTS engine: {tts_engine}")
+    segments = stream_lecture_segments(text_content, OLLAMA_MODEL_NAME, tts_engine)
+    lecture_script = synthesize_segments(segments, tts_engine, final_audio_path, runner)
     logging.info("Lecture script generation completed.")
+    return lecture_script
 
+
+def stage_cache_keys(input_path: str, is_pdf: bool, tts_engine: str, ocr_engine: str = OCR_ENGINE):
+    """
+    Returns functions building the cache key of each stage. Every key covers
+    the stage's own input and settings only, so a changed setting reruns that
+    stage and whatever it produces differently downstream. Settings are
+    those of this process; they are passed to the stages with each request
+    (and checked where a warm worker cannot change them), so a daemon started
+    with a different environment cannot produce results under these keys.
+    """
+    def ocr_key():
+        settings = {
+            "craft": CRAFT_CONFIG,
+            "trocr_model": TROCR_MODEL_ID,
+            "generation": TROCR_GENERATION_CONFIG,
+            "min_confidence": TROCR_MIN_CONFIDENCE,
+            "quantize": QUANTIZE,
+            "engine": ocr_engine,
+        }
+        if ocr_engine == "auto":
+            settings["printed_threshold"] = PRINTED_THRESHOLD
+        if is_pdf:
+            # text layer pages plus OCR of the scanned ones, rendered first
+            settings["parser"] = "PyPDF2"
+            settings["renderer"] = "pypdfium2"
+            settings["render_dpi"] = RENDER_DPI
+        return cache_key("ocr", file_digest(input_path), settings)
+
+    def llm_key(text_content, stream=False):
+        # streamed scripts are split and cleaned up per paragraph
+        settings = {"chunk_tokens": CHUNK_TOKENS, "context_tokens": CONTEXT_TOKENS, "stream": stream}
+        return cache_key("llm", text_digest(text_content), OLLAMA_MODEL_NAME, SYSTEM_PROMPTS_MAP.get(tts_engine), settings)
+
+    def tts_key(lecture_script):
+        return cache_key("tts", text_digest(lecture_script), tts_engine, TTS_CONFIG.get(tts_engine))
+
+    return ocr_key, llm_key, tts_key
+
+
+def new_job(input_path: str, tts_engine: str, ocr_engine: str = OCR_ENGINE) -> dict:
+    """
+    Describes one document's trip through the pipeline; the stage functions
+    below fill in its text, lecture script and audio path.
+    """
+    is_pdf = os.path.splitext(input_path)[1].lower() == '.pdf'
     base_name = os.path.splitext(os.path.basename(input_path))[0]
-    lecture_text_filename = f"{base_name}_{ollama_model_name.replace(':', '-')}_{tts_engine}.txt"
+    final_ext = 'mp3' if tts_engine == 'elevenlabs_v2' else 'wav'
+    ocr_key, llm_key, tts_key = stage_cache_keys(input_path, is_pdf, tts_engine, ocr_engine)
+    return {
+        "input_path": input_path,
+        "is_pdf": is_pdf,
+        "tts_engine": tts_engine,
+        "ocr_engine": ocr_engine,
+        "base_name": base_name,
+        "final_audio_path": os.path.join(PROJECT_ROOT, 'Final_Output', f"{base_name}_{tts_engine}.{final_ext}"),
+        "cache_keys": (ocr_key, llm_key, tts_key),
+        "audio_done": False,
+    }
+
+
+def ocr_step(job: dict, runner, cache=None, ocr_workers: int = DEFAULT_OCR_WORKERS) -> None:
+    ocr_key = job["cache_keys"][0]
+    key = ocr_key() if cache else None
+    text_content = cache.get_text("ocr", key) if cache else None
+    if text_content is not None:
+        logging.info(f"Using cached OCR result for {job['input_path']}.")
+    else:
+        text_content = extract_text(job["input_path"], job["is_pdf"], runner, ocr_workers, job["ocr_engine"])
+        if cache and text_content:
+            cache.put_text("ocr", key, text_content)
+    if not text_content:
+        raise StageError("No text was extracted from the input file.")
+    logging.info(f"Extracted text length: {len(text_content)} characters.")
+    job["text"] = text_content
+
+
+def llm_step(job: dict, runner, cache=None, stream: bool = False) -> None:
+    llm_key = job["cache_keys"][1]
+    tts_engine = job["tts_engine"]
+    key = llm_key(job["text"], stream) if cache else None
+    lecture_script = cache.get_text("llm", key) if cache else None
+    if lecture_script is not None:
+        logging.info(f"Using cached lecture script for {job['input_path']}.")
+    else:
+        if stream:
+            os.makedirs(os.path.dirname(job["final_audio_path"]), exist_ok=True)
+            lecture_script = stream_lecture(job["text"], tts_engine, job["final_audio_path"], runner)
+            job["audio_done"] = True
+        else:
+            lecture_script = generate_lecture(job["text"], tts_engine, runner)
+        if cache:
+            cache.put_text("llm", key, lecture_script)
+    job["script"] = lecture_script
+
+    nlp_output_dir = os.path.join(PROJECT_ROOT, 'step_outputs', 'llm_outputs')
+    os.makedirs(nlp_output_dir, exist_ok=True)
+    lecture_text_filename = f"{job['base_name']}_{OLLAMA_MODEL_NAME.replace(':', '-')}_{tts_engine}.txt"
     lecture_text_path = os.path.join(nlp_output_dir, lecture_text_filename)
     try:
         with open(lecture_text_path, 'w', encoding='utf-8') as f:
@@ -153,64 +183,209 @@ def main():
     else:
         logging.info(f"Lecture script saved to {lecture_text_path}")
 
-    final_ext = 'mp3' if tts_engine == 'elevenlabs_v2' else 'wav'
-    final_audio_filename = f"{base_name}_{tts_engine}.{final_ext}"
-    final_audio_path = os.path.join(final_output_dir, final_audio_filename)
-    logging.info(f"Converting lecture script to speech using TTS engine: {tts_engine}")
 
-    try:
-        if tts_engine == 'chatterbox':
-            if not os.path.exists(chatter_env_python):
-                logging.error(f"Chatterbox Python executable not found at '{chatter_env_python}'. Please ensure .venv_chatter is set up.")
-                sys.exit(1)
-            if not os.path.exists(chatterbox_script):
-                logging.error(f"Chatterbox script not found at '{chatterbox_script}'. Please ensure chatterbox_audio.py exists.")
-                sys.exit(1)
-            cmd = [chatter_env_python, chatterbox_script, "--text", lecture_script, "--output", final_audio_path]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-            if result.stderr:
-                logging.info(f"Chatterbox TTS Subprocess Stderr: {result.stderr.strip()}")
-        elif tts_engine == 'elevenlabs_v2':
-            if not os.path.exists(elevenlabs_env_python):
-                logging.error(f"ElevenLabs Python executable not found at '{elevenlabs_env_python}'. Please ensure .venv_elevenlabs is set up.")
-                sys.exit(1)
-            if not os.path.exists(elevenlabs_script):
-                logging.error(f"ElevenLabs script not found at '{elevenlabs_script}'. Please ensure elevenlabs_audio.py exists.")
-                sys.exit(1)
-            cmd = [elevenlabs_env_python, elevenlabs_script, "--text", lecture_script, "--output", final_audio_path]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-            if result.stderr:
-                logging.info(f"ElevenLabs TTS Subprocess Stderr: {result.stderr.strip()}")
-        elif tts_engine == 'dia':
-            if not os.path.exists(dia_env_python):
-                logging.error(f"DIA Python executable not found at '{dia_env_python}'. Please ensure .venv_dia is set up.")
-                sys.exit(1)
-            if not os.path.exists(dia_script):
-                logging.error(f"DIA script not found at '{dia_script}'. Please ensure dia_audio.py exists.")
-                sys.exit(1)
-            cmd = [dia_env_python, dia_script, "--text", lecture_script, "--output", final_audio_path]
-            result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-            if result.stderr:
-                logging.info(f"DIA TTS Subprocess Stderr: {result.stderr.strip()}")
-        else:
-            logging.error(f"Unknown TTS engine: {tts_engine}")
+def tts_step(job: dict, runner, cache=None) -> None:
+    tts_key = job["cache_keys"][2]
+    final_audio_path = job["final_audio_path"]
+    os.makedirs(os.path.dirname(final_audio_path), exist_ok=True)
+
+    key = tts_key(job["script"]) if cache else None
+    if not job["audio_done"]:
+        if cache and cache.get_file("tts", key, final_audio_path):
+            logging.info(f"Using cached lecture audio for {job['input_path']}.")
+            return
+        synthesize_lecture(job["script"], job["tts_engine"], final_audio_path, runner)
+
+    if not os.path.isfile(final_audio_path):
+        raise StageError("TTS process completed, but no audio file was found.")
+    if cache:
+        cache.put_file("tts", key, final_audio_path)
+
+
+def process_document(input_path: str, tts_engine: str, runner, stream: bool = False, cache=None,
+                     ocr_workers: int = DEFAULT_OCR_WORKERS, ocr_engine: str = OCR_ENGINE) -> str:
+    """
+    Runs OCR/PDF parsing, lecture generation and TTS for one document and
+    returns the path of the final audio file. With stream=True, TTS starts on
+    the first generated paragraph instead of waiting for the whole script.
+    With a ResultCache, stages whose input and settings are unchanged are
+    skipped. Stage failures raise StageError.
+    """
+    logging.info(f"Processing input file: {input_path}")
+    job = new_job(input_path, tts_engine, ocr_engine)
+    ocr_step(job, runner, cache, ocr_workers)
+    llm_step(job, runner, cache, stream)
+    tts_step(job, runner, cache)
+    return job["final_audio_path"]
+
+
+def process_batch(input_paths, tts_engine: str, runner, cache=None, ocr_workers: int = DEFAULT_OCR_WORKERS,
+                  llm_workers: int = 1, tts_workers: int = 1, ocr_engine: str = OCR_ENGINE):
+    """
+    Runs many documents through OCR -> LLM -> TTS as a staged pipeline, each
+    stage with its own bounded number of workers, so the stages of different
+    documents overlap. Returns the finished jobs; failed ones carry "error".
+    """
+    pipeline = StagedPipeline([
+        # a PDF already spreads its scanned pages over the OCR workers
+        ("ocr", lambda job: ocr_step(job, runner, cache, ocr_workers), ocr_workers),
+        ("llm", lambda job: llm_step(job, runner, cache), llm_workers),
+        ("tts", lambda job: tts_step(job, runner, cache), tts_workers),
+    ])
+    return pipeline.run([new_job(path, tts_engine, ocr_engine) for path in input_paths])
+
+
+SUPPORTED_EXTENSIONS = ['.pdf', '.png', '.jpg', '.jpeg', '.bmp', '.gif', '.tiff', '.webp']
+
+
+def collect_inputs(input_dir: str = None, manifest: str = None):
+    """
+    Lists the documents of a batch run: the supported files directly inside
+    input_dir, or the paths listed one per line in a manifest ('#' starts a
+    comment, relative paths are resolved against the manifest's directory).
+
+    Every stage names its outputs after the file name without extension, so
+    documents sharing one (week1/page1.png and week2/page1.png, or notes.pdf
+    and notes.png) would overwrite each other; they raise ValueError.
+    """
+    if input_dir:
+        paths = sorted(
+            os.path.join(input_dir, name) for name in os.listdir(input_dir)
+            if os.path.splitext(name)[1].lower() in SUPPORTED_EXTENSIONS
+            and os.path.isfile(os.path.join(input_dir, name))
+        )
+    else:
+        base_dir = os.path.dirname(os.path.abspath(manifest))
+        paths = []
+        with open(manifest, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    paths.append(os.path.join(base_dir, line))
+
+    by_name = {}
+    for path in paths:
+        # lower-cased, since Windows and macOS file names ignore case
+        by_name.setdefault(os.path.splitext(os.path.basename(path))[0].lower(), []).append(path)
+    clashes = [same for same in by_name.values() if len(same) > 1]
+    if clashes:
+        raise ValueError("These documents would write to the same output files; rename them or run them in "
+                         "separate batches: " + "; ".join(", ".join(same) for same in clashes))
+    return paths
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    parser = argparse.ArgumentParser(description="Lecture Synthesizer: Convert document to lecture audio.")
+    inputs = parser.add_mutually_exclusive_group(required=True)
+    inputs.add_argument('--input', '-i', help="Path to the input file (PDF or image)")
+    inputs.add_argument('--input-dir', help="Convert every PDF or image in this directory")
+    inputs.add_argument('--manifest', help="Convert the files listed in this text file, one path per line")
+    parser.add_argument('--tts', '-t', required=True, choices=['chatterbox', 'elevenlabs_v2', 'dia'],
+                        help="TTS engine to use: 'chatterbox', 'elevenlabs_v2', or 'dia'")
+    parser.add_argument('--ocr-engine', choices=OCR_ENGINES, default=OCR_ENGINE,
+                        help="OCR engine for images and scanned pages: 'trocr' (CRAFT + TrOCR), 'tesseract', or "
+                             "'auto' to send printed pages to Tesseract and handwriting to TrOCR")
+    parser.add_argument('--daemon', metavar='SOCKET', nargs='?', const="",
+                        help="Dispatch stages to a running pipeline daemon (python pipeline/daemon.py) instead of "
+                             "cold-starting each stage; SOCKET defaults to the daemon's per-user socket")
+    parser.add_argument('--stream', action='store_true',
+                        help="Stream the lecture from Ollama and synthesize it paragraph by paragraph")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Rerun every stage instead of reusing cached OCR, lecture and audio results")
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Size limit of the stage result cache; least recently used results are evicted")
+    parser.add_argument('--ocr-workers', type=int, default=DEFAULT_OCR_WORKERS,
+                        help="Number of scanned PDF pages (or batch documents) recognized in parallel")
+    parser.add_argument('--llm-workers', type=int, default=1,
+                        help="Batch mode: number of lectures generated in parallel")
+    parser.add_argument('--tts-workers', type=int, default=1,
+                        help="Batch mode: number of lectures synthesized in parallel")
+    args = parser.parse_args()
+
+    if min(args.ocr_workers, args.llm_workers, args.tts_workers) < 1:
+        parser.error("worker counts must be at least 1")
+    batch = args.input is None
+    if batch and args.stream:
+        parser.error("--stream only applies to a single --input file")
+
+    tts_engine = args.tts
+
+    if batch:
+        source = args.input_dir or args.manifest
+        if not os.path.exists(source):
+            logging.error(f"Input not found: {source}")
             sys.exit(1)
-    except FileNotFoundError as e:
-        logging.error(f"TTS execution failed: {e}. Ensure the correct virtual environment and TTS script exist.")
-        sys.exit(1)
-    except subprocess.CalledProcessError as e:
-        logging.error(f"TTS script returned error code {e.returncode}. Stderr: {e.stderr.strip()}")
-        sys.exit(1)
-    except Exception as e:
-        logging.error(f"An unexpected error occurred during TTS conversion: {e}")
-        sys.exit(1)
+        try:
+            input_paths = collect_inputs(args.input_dir, args.manifest)
+        except ValueError as e:
+            logging.error(str(e))
+            sys.exit(1)
+        if not input_paths:
+            logging.error(f"No PDF or image files found in {source}")
+            sys.exit(1)
+    else:
+        input_paths = [args.input]
 
-    if os.path.isfile(final_audio_path):
-        logging.info(f"Audio output saved to {final_audio_path}")
+    for input_path in input_paths:
+        if not os.path.isfile(input_path):
+            logging.error(f"Input file not found: {input_path}")
+            sys.exit(1)
+        if os.path.splitext(input_path)[1].lower() not in SUPPORTED_EXTENSIONS:
+            logging.error(f"Unsupported file type: {input_path}. Please provide PDF or image files as input.")
+            sys.exit(1)
+
+    if args.daemon is not None:
+        # the daemon needs Unix sockets, so it is only imported when asked for
+        try:
+            from pipeline.daemon import DEFAULT_SOCKET_PATH, DaemonClient
+            socket_path = args.daemon or DEFAULT_SOCKET_PATH
+            runner = DaemonClient(socket_path)
+        except StageError as e:
+            logging.error(str(e))
+            sys.exit(1)
+        logging.info(f"Dispatching stages to pipeline daemon at {socket_path}")
+    elif batch:
+        # every stage keeps its models loaded across the documents of the batch
+        runner = WorkerPool({"ocr": args.ocr_workers, "llm": args.llm_workers, tts_engine: args.tts_workers})
+    elif args.stream:
+        # segments go to one warm TTS worker instead of a cold start each
+        runner = WorkerPool()
     else:
-        logging.error("TTS process completed, but no audio file was found.")
+        runner = SubprocessRunner()
+
+    cache = None if args.no_cache else ResultCache(max_bytes=args.cache_max_mb * 1024 * 1024)
+
+    if batch:
+        try:
+            jobs = process_batch(input_paths, tts_engine, runner, cache=cache, ocr_workers=args.ocr_workers,
+                                 llm_workers=args.llm_workers, tts_workers=args.tts_workers,
+                                 ocr_engine=args.ocr_engine)
+        finally:
+            runner.close()
+
+        failed = [job for job in jobs if "error" in job]
+        for job in jobs:
+            if "error" in job:
+                logging.error(f"{job['input_path']}: {job['error']}")
+            else:
+                logging.info(f"{job['input_path']} -> {job['final_audio_path']}")
+        logging.info(f"Batch complete: {len(jobs) - len(failed)} of {len(jobs)} documents converted.")
+        if failed:
+            sys.exit(1)
+        return
+
+    try:
+        final_audio_path = process_document(input_paths[0], tts_engine, runner, stream=args.stream, cache=cache,
+                                            ocr_workers=args.ocr_workers, ocr_engine=args.ocr_engine)
+    except (StageError, RuntimeError) as e:
+        logging.error(str(e))
         sys.exit(1)
+    finally:
+        runner.close()
 
+    logging.info(f"Audio output saved to {final_audio_path}")
     logging.info("Processing complete. Lecture audio is ready.")
 
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+# Settings of the lecture generation stage: context size and chunking.
+import os
+
+# Context window requested from Ollama (num_ctx); llama3:8b supports 8192.
+# Without it Ollama uses its small default and silently drops the start of
+# long prompts.
+CONTEXT_TOKENS = 8192
+
+# Notes estimated above this many tokens are split on page and section
+# boundaries into chunks of at most this size. Each chunk becomes a lecture
+# segment of its own, and a short merge pass writes the transitions between
+# them. This leaves room in CONTEXT_TOKENS for the system prompt and the
+# generated segment. 0 always sends the notes in one request.
+CHUNK_TOKENS = int(os.environ.get("LLM_CHUNK_TOKENS", 1500))
+
+# Chunks generated at the same time. Ollama only runs them in parallel up to
+# its OLLAMA_NUM_PARALLEL setting and queues the rest.
+MAP_WORKERS = int(os.environ.get("LLM_MAP_WORKERS", 2))
+
+# Rough token estimate for English text with llama3-style tokenizers.
+CHARS_PER_TOKEN = 4
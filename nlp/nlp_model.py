@@ -1,9 +1,42 @@
 import requests
+import json
 import os
+import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
 
+# streamed text is handed to TTS at paragraph breaks, or at the first sentence
+# end once a unit has at least this many characters
+MIN_SEGMENT_CHARS = 200
+
+SENTENCE_END = re.compile(r'[.!?]["\')\]]*\s+')
+SPEAKER_TAG = re.compile(r'\[S\d+\]')
+SSML_WRAPPER = re.compile(r'</?speak>')
+
+# pdf_parser separates the pages of a PDF with a form feed
+PAGE_BREAK = "\f"
+# markdown, numbered ("2.", "4)", "3.1") and lettered ("IV.", "B)") headings and
+# short all-caps lines start a new section of the notes
+HEADING = re.compile(r'^\s*(#{1,6}\s|(\d+[.)]|\d+(\.\d+)+|[IVX]+\.|[A-Z][.)])\s+\S|[A-Z][A-Z0-9 ,:&/-]{3,59}$)')
+# an oversized section is split at paragraphs, then lines, sentences and words
+SPLIT_SEPARATORS = ("\n\n", "\n", ". ", " ")
+# how much of the neighbouring segments the merge pass sees
+TRANSITION_CONTEXT_CHARS = 600
+
+TRANSITION_PROMPT = """You are editing a spoken lecture that was written in parts. Write one or two spoken sentences \
+that lead from the end of one part into the start of the next, matching their tone and formatting. \
+Output only the transition.
+
+End of the previous part:
+{tail}
+
+Start of the next part:
+{head}
+
+Transition:"""
+
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 try:
     from system_prompts import SYSTEM_PROMPTS_MAP
@@ -12,18 +45,77 @@ except ImportError:
           "Please ensure system_prompts.py exists in the same directory and defines SYSTEM_PROMPTS_MAP.", file=sys.stderr)
     sys.exit(1)
 
+from nlp_config import CHARS_PER_TOKEN, CHUNK_TOKENS, CONTEXT_TOKENS, MAP_WORKERS
 
-def generate_professor_lecture(notes: str, ollama_model_name: str, system_prompt_type: str) -> str:
-    system_prompt = SYSTEM_PROMPTS_MAP.get(system_prompt_type)
 
-    if not system_prompt:
-        return f"[ERROR] Invalid system_prompt_type: '{system_prompt_type}'. " \
-               f"Available types: {list(SYSTEM_PROMPTS_MAP.keys())}"
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _sections(notes: str):
+    """
+    Yields the sections of the notes: pages, split further before headings.
+    """
+    for page in notes.split(PAGE_BREAK):
+        section = []
+        for line in page.splitlines():
+            if HEADING.match(line) and any(l.strip() for l in section):
+                yield "\n".join(section).strip()
+                section = []
+            section.append(line)
+        text = "\n".join(section).strip()
+        if text:
+            yield text
+
+
+def _pack(units, separator: str, max_tokens: int):
+    """
+    Joins consecutive units with separator into pieces of at most max_tokens.
+    """
+    piece = ""
+    for unit in units:
+        candidate = f"{piece}{separator}{unit}" if piece else unit
+        if piece and estimate_tokens(candidate) > max_tokens:
+            yield piece
+            piece = unit
+        else:
+            piece = candidate
+    if piece:
+        yield piece
 
+
+def _split(text: str, max_tokens: int, separators=SPLIT_SEPARATORS):
+    """
+    Splits one section that is too long for a chunk at the coarsest separator
+    that occurs in it.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+    for index, separator in enumerate(separators):
+        parts = [part for part in text.split(separator) if part.strip()]
+        if len(parts) > 1:
+            units = [piece for part in parts for piece in _split(part, max_tokens, separators[index + 1:])]
+            return list(_pack(units, separator, max_tokens))
+    step = max_tokens * CHARS_PER_TOKEN
+    return [text[start:start + step] for start in range(0, len(text), step)]
+
+
+def split_notes(notes: str, max_tokens: int = CHUNK_TOKENS):
+    """
+    Splits notes into chunks of at most max_tokens (estimated). Whole pages
+    and sections are kept together where they fit, and consecutive short ones
+    share a chunk.
+    """
+    units = [piece for section in _sections(notes) for piece in _split(section, max_tokens)]
+    return list(_pack(units, "\n\n", max_tokens))
+
+
+def _generate(prompt: str, ollama_model_name: str, system_prompt_type: str) -> str:
     payload = {
         "model": ollama_model_name,
-        "prompt": f"{system_prompt}\n\nLecture Notes:\n{notes}\n\nLecture Script:",
-        "stream": False
+        "prompt": prompt,
+        "stream": False,
+        "options": {"num_ctx": CONTEXT_TOKENS},
     }
 
     try:
@@ -38,17 +130,197 @@ def generate_professor_lecture(notes: str, ollama_model_name: str, system_prompt
     except KeyError:
         return f"[ERROR] Unexpected response format from Ollama. Response: {response.text}"
 
+
+def _part_instructions(index: int, total: int) -> str:
+    if index == 0:
+        position = "Open the lecture, but do not conclude it; the following parts continue it."
+    elif index == total - 1:
+        position = "Continue the lecture without greeting the audience again, and conclude it."
+    else:
+        position = "Continue the lecture without greeting the audience again or concluding it."
+    return f"These notes are part {index + 1} of {total} of a longer document. {position}"
+
+
+def _generate_chunked(chunks, system_prompt: str, ollama_model_name: str, system_prompt_type: str,
+                      max_workers: int = MAP_WORKERS) -> str:
+    """
+    Map-reduce lecture generation: every chunk of the notes becomes a lecture
+    segment, up to max_workers requests at a time, then one short request per
+    boundary writes a transition between neighbouring segments.
+    """
+    prompts = [
+        f"{system_prompt}\n\n{_part_instructions(index, len(chunks))}\n\nLecture Notes:\n{chunk}\n\nLecture Script:"
+        for index, chunk in enumerate(chunks)
+    ]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        segments = list(executor.map(lambda prompt: _generate(prompt, ollama_model_name, system_prompt_type), prompts))
+        for segment in segments:
+            if segment.startswith("[ERROR]"):
+                return segment
+
+        # <speak> wraps the whole lecture once, not every segment
+        wrapped = any(SSML_WRAPPER.search(segment) for segment in segments)
+        segments = [SSML_WRAPPER.sub("", segment).strip() for segment in segments]
+
+        transitions = list(executor.map(
+            lambda pair: _generate(
+                TRANSITION_PROMPT.format(tail=pair[0][-TRANSITION_CONTEXT_CHARS:], head=pair[1][:TRANSITION_CONTEXT_CHARS]),
+                ollama_model_name, system_prompt_type
+            ),
+            zip(segments, segments[1:])
+        ))
+
+    parts = [segments[0]]
+    for transition, segment in zip(transitions, segments[1:]):
+        if transition.startswith("[ERROR]"):
+            # a missing transition still leaves a complete lecture
+            print(f"Skipping a transition: {transition}", file=sys.stderr)
+        else:
+            parts.append(SSML_WRAPPER.sub("", transition).strip())
+        parts.append(segment)
+
+    lecture = "\n\n".join(part for part in parts if part)
+    return f"<speak>\n{lecture}\n</speak>" if wrapped else lecture
+
+
+def generate_professor_lecture(notes: str, ollama_model_name: str, system_prompt_type: str,
+                               max_chunk_tokens: int = CHUNK_TOKENS) -> str:
+    """
+    Returns the lecture script, or an "[ERROR] ..." message. Notes longer than
+    max_chunk_tokens (estimated) are generated chunk by chunk and merged; 0
+    always uses a single request.
+    """
+    system_prompt = SYSTEM_PROMPTS_MAP.get(system_prompt_type)
+
+    if not system_prompt:
+        return f"[ERROR] Invalid system_prompt_type: '{system_prompt_type}'. " \
+               f"Available types: {list(SYSTEM_PROMPTS_MAP.keys())}"
+
+    if max_chunk_tokens > 0 and estimate_tokens(notes) > max_chunk_tokens:
+        chunks = split_notes(notes, max_chunk_tokens)
+        if len(chunks) > 1:
+            print(f"Notes of ~{estimate_tokens(notes)} tokens split into {len(chunks)} chunks", file=sys.stderr)
+            return _generate_chunked(chunks, system_prompt, ollama_model_name, system_prompt_type)
+
+    return _generate(f"{system_prompt}\n\nLecture Notes:\n{notes}\n\nLecture Script:", ollama_model_name, system_prompt_type)
+
+def split_segments(buffer: str, min_chars: int = MIN_SEGMENT_CHARS):
+    """
+    Splits complete units off the front of a streamed buffer.
+    Returns (segments, rest) where rest is the incomplete tail.
+    """
+    segments = []
+    while True:
+        paragraph_end = buffer.find("\n\n")
+        sentence_end = SENTENCE_END.search(buffer, min_chars)
+        if sentence_end is not None and (paragraph_end == -1 or sentence_end.start() < paragraph_end):
+            cut = sentence_end.end()
+        elif paragraph_end != -1:
+            cut = paragraph_end + 2
+        else:
+            break
+        segment = buffer[:cut].strip()
+        buffer = buffer[cut:]
+        if segment:
+            segments.append(segment)
+    return segments, buffer
+
+
+def stream_professor_lecture(notes: str, ollama_model_name: str, system_prompt_type: str):
+    """
+    Same request as generate_professor_lecture, but consumes Ollama's NDJSON
+    stream and yields the script as sentence/paragraph units as soon as each one
+    is complete. Dia units are re-tagged with the current speaker and <speak>
+    wrappers are dropped so every unit can be synthesized on its own.
+    Errors are yielded as a single "[ERROR] ..." unit.
+    """
+    system_prompt = SYSTEM_PROMPTS_MAP.get(system_prompt_type)
+
+    if not system_prompt:
+        yield f"[ERROR] Invalid system_prompt_type: '{system_prompt_type}'. " \
+              f"Available types: {list(SYSTEM_PROMPTS_MAP.keys())}"
+        return
+
+    payload = {
+        "model": ollama_model_name,
+        "prompt": f"{system_prompt}\n\nLecture Notes:\n{notes}\n\nLecture Script:",
+        "stream": True,
+        "options": {"num_ctx": CONTEXT_TOKENS},
+    }
+
+    speaker = None
+
+    def finish(segment):
+        nonlocal speaker
+        segment = SSML_WRAPPER.sub("", segment).strip()
+        tags = SPEAKER_TAG.findall(segment)
+        if speaker is not None and not SPEAKER_TAG.match(segment):
+            segment = f"{speaker} {segment}"
+        if tags:
+            speaker = tags[-1]
+        return segment
+
+    try:
+        with requests.post(OLLAMA_URL, json=payload, stream=True) as response:
+            response.raise_for_status()
+            buffer = ""
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    yield f"[ERROR] Ollama reported an error: {chunk['error']}"
+                    return
+                buffer += chunk.get("response", "")
+                segments, buffer = split_segments(buffer)
+                for segment in segments:
+                    segment = finish(segment)
+                    if segment:
+                        yield segment
+                if chunk.get("done"):
+                    break
+            segment = finish(buffer)
+            if segment:
+                yield segment
+
+    except requests.exceptions.ConnectionError:
+        yield f"[ERROR] Could not connect to Ollama at {OLLAMA_URL}. Is Ollama running and accessible?"
+    except requests.RequestException as e:
+        yield f"[ERROR] Failed with model '{ollama_model_name}' and prompt type '{system_prompt_type}': {e}"
+    except ValueError as e:
+        yield f"[ERROR] Unexpected stream format from Ollama: {e}"
+
 if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from pipeline.worker import STDIN_PATH, read_text, serve
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(generate_professor_lecture)
+        sys.exit(0)
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--stream":
+        if len(sys.argv) < 5:
+            print("Usage: python generate_lecture.py --stream <notes_text | -> <ollama_model_name> <system_prompt_type>", file=sys.stderr)
+            sys.exit(1)
+        notes_text = read_text(STDIN_PATH) if sys.argv[2] == STDIN_PATH else sys.argv[2]
+        # one JSON-encoded unit per line so newlines inside a unit survive
+        for segment in stream_professor_lecture(notes_text, sys.argv[3], sys.argv[4]):
+            print(json.dumps(segment), flush=True)
+        sys.exit(0)
+
     if len(sys.argv) < 4:
-        print("Usage: python generate_lecture.py <notes_text> <ollama_model_name> <system_prompt_type>", file=sys.stderr)
+        print("Usage: python generate_lecture.py <notes_text | -> <ollama_model_name> <system_prompt_type> [max_chunk_tokens]", file=sys.stderr)
         sys.exit(1)
     
-    notes_text = sys.argv[1]
+    # "-" reads the notes from stdin, so long documents stay out of argv
+    notes_text = read_text(STDIN_PATH) if sys.argv[1] == STDIN_PATH else sys.argv[1]
     ollama_model_name = sys.argv[2]
     system_prompt_type = sys.argv[3]
+    max_chunk_tokens = int(sys.argv[4]) if len(sys.argv) > 4 else CHUNK_TOKENS
     
     try:
-        generated_lecture = generate_professor_lecture(notes_text, ollama_model_name, system_prompt_type)
+        generated_lecture = generate_professor_lecture(notes_text, ollama_model_name, system_prompt_type, max_chunk_tokens)
         print(generated_lecture)
     except Exception as e:
         print(f"Error during lecture generation: {e}", file=sys.stderr)
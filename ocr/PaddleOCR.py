@@ -1,37 +1,133 @@
-from paddleocr import PaddleOCR, draw_ocr
-from PIL import Image
+import argparse
 import os
+import sys
 
-ocr = PaddleOCR(use_angle_cls=True, lang='en', use_gpu=False)
+import cv2
 
-def run_paddle_ocr(image_path: str, output_dir: str = "PaddleOCR") -> str:
-    os.makedirs(output_dir, exist_ok=True)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import layout
+
+DEFAULT_REC_BATCH_NUM = 16
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+_engines = {}
+
+
+def get_engine(use_angle_cls: bool = True, rec_batch_num: int = DEFAULT_REC_BATCH_NUM):
+    """
+    Returns a PaddleOCR instance for these settings, created on first use so
+    importing this module does not load the models.
+    """
+    key = (use_angle_cls, rec_batch_num)
+    if key not in _engines:
+        from paddleocr import PaddleOCR
+
+        _engines[key] = PaddleOCR(
+            use_angle_cls=use_angle_cls, lang='en', use_gpu=False,
+            rec_batch_num=rec_batch_num, show_log=False
+        )
+    return _engines[key]
+
+
+def _read_image(image):
+    if not isinstance(image, str):
+        return image
+    img = cv2.imread(image)
+    if img is None:
+        raise FileNotFoundError(f"Could not read image: {image}")
+    return img
+
+
+def recognize(images, use_angle_cls: bool = True, rec_batch_num: int = DEFAULT_REC_BATCH_NUM):
+    """
+    Runs detection and recognition on one image or a list of them (paths or
+    BGR arrays). Every image is decoded once and passed to ocr() as an array;
+    the text regions of an image are recognized rec_batch_num at a time.
+
+    Output:
+        per image, a list of {"box": 4 corner points clockwise from top-left,
+        "text": str, "confidence": float}
+    """
+    single = not isinstance(images, (list, tuple))
+    engine = get_engine(use_angle_cls, rec_batch_num)
 
-    results = ocr.ocr(image_path, cls=True)
+    results = []
+    for image in ([images] if single else images):
+        pages = engine.ocr(_read_image(image), cls=use_angle_cls)
+        # pages[0] is None when nothing was detected
+        results.append([
+            {"box": [[float(x), float(y)] for x, y in box], "text": text, "confidence": float(confidence)}
+            for box, (text, confidence) in (pages[0] or [])
+        ])
+    return results[0] if single else results
 
-    lines = []
-    for line in results:
-        for box, (text, confidence) in line:
-            lines.append(text)
 
-    final_text = "\n".join(lines)
+def ordered_text(regions) -> str:
+    """
+    Joins recognized regions in reading order, regions on the same line
+    separated by spaces.
+    """
+    lines, _ = layout.group_lines([region["box"] for region in regions], min_size=0)
+    return "\n".join(" ".join(regions[i]["text"] for i in line.boxes) for line in lines)
 
-    image_name = os.path.splitext(os.path.basename(image_path))[0]
-    output_txt_path = os.path.join(output_dir, f"{image_name}.txt")
-    with open(output_txt_path, "w", encoding="utf-8") as f:
-        f.write(final_text)
+
+def _annotate(image_path: str, regions, output_path: str) -> None:
+    from paddleocr import draw_ocr
+    from PIL import Image
 
     image = Image.open(image_path).convert("RGB")
-    boxes = [res[0] for line in results for res in line]
-    texts = [res[1][0] for line in results for res in line]
-    scores = [res[1][1] for line in results for res in line]
-    font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
-    annotated_img = draw_ocr(image, boxes, texts, scores, font_path=font_path)
-    annotated_img = Image.fromarray(annotated_img)
-    output_img_path = os.path.join(output_dir, f"paddle_annotated_{image_name}.png")
-    annotated_img.save(output_img_path)
-
-    print(f"Processed: {image_path}")
-    print(f"→ Text saved to: {output_txt_path}")
-    print(f"→ Annotated image saved to: {output_img_path}")
-    return final_text
+    annotated_img = draw_ocr(
+        image,
+        [region["box"] for region in regions],
+        [region["text"] for region in regions],
+        [region["confidence"] for region in regions],
+        font_path=FONT_PATH
+    )
+    Image.fromarray(annotated_img).save(output_path)
+
+
+def run_paddle_ocr_batch(image_paths, output_dir: str = "PaddleOCR", annotate: bool = False,
+                         use_angle_cls: bool = True, rec_batch_num: int = DEFAULT_REC_BATCH_NUM):
+    """
+    OCRs the images and writes <name>.txt for each, plus an annotated PNG with
+    annotate. Returns one text per image path.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    texts = []
+    for image_path, regions in zip(image_paths, recognize(list(image_paths), use_angle_cls, rec_batch_num)):
+        final_text = ordered_text(regions)
+
+        image_name = os.path.splitext(os.path.basename(image_path))[0]
+        output_txt_path = os.path.join(output_dir, f"{image_name}.txt")
+        with open(output_txt_path, "w", encoding="utf-8") as f:
+            f.write(final_text)
+
+        print(f"Processed: {image_path}")
+        print(f"→ Text saved to: {output_txt_path}")
+        if annotate:
+            output_img_path = os.path.join(output_dir, f"paddle_annotated_{image_name}.png")
+            _annotate(image_path, regions, output_img_path)
+            print(f"→ Annotated image saved to: {output_img_path}")
+        texts.append(final_text)
+    return texts
+
+
+def run_paddle_ocr(image_path: str, output_dir: str = "PaddleOCR", annotate: bool = False,
+                   use_angle_cls: bool = True) -> str:
+    return run_paddle_ocr_batch([image_path], output_dir, annotate, use_angle_cls)[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PaddleOCR on one or more images.")
+    parser.add_argument("image_paths", nargs="+")
+    parser.add_argument("--output-dir", default="PaddleOCR")
+    parser.add_argument("--annotate", action="store_true",
+                        help="Also save each image with the detected boxes and texts drawn on it.")
+    parser.add_argument("--no-angle-cls", action="store_true",
+                        help="Skip the text angle classifier; faster on upright scans.")
+    parser.add_argument("--rec-batch-num", type=int, default=DEFAULT_REC_BATCH_NUM,
+                        help="Number of text regions recognized per batch.")
+    args = parser.parse_args()
+
+    run_paddle_ocr_batch(args.image_paths, args.output_dir, annotate=args.annotate,
+                         use_angle_cls=not args.no_angle_cls, rec_batch_num=args.rec_batch_num)
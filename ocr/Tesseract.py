@@ -1,31 +1,153 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import cv2
 import pytesseract
-from PIL import Image
-import os
 
-def run_tesseract_ocr(image_path: str, output_dir: str = "OCR_outputs/Tesseract") -> str:
-    os.makedirs(output_dir, exist_ok=True)
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 1))
+DEFAULT_OMP_THREAD_LIMIT = 1
+MULTI_PAGE_EXTENSIONS = (".tif", ".tiff")
 
-    img = cv2.imread(image_path)
+
+def preprocess(img, color_conversion: int = cv2.COLOR_BGR2GRAY):
+    """
+    Upscales and binarizes a BGR page (RGB with COLOR_RGB2GRAY); returns the
+    grayscale array Tesseract reads.
+    """
     img = cv2.resize(img, None, fx=1.5, fy=1.5, interpolation=cv2.INTER_CUBIC)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(img, color_conversion)
     gray = cv2.medianBlur(gray, 3)
-    thresh = cv2.adaptiveThreshold(
+    return cv2.adaptiveThreshold(
         gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 2
     )
 
-    image_name = os.path.splitext(os.path.basename(image_path))[0]
-    preprocessed_path = os.path.join(output_dir, f"{image_name}_preprocessed.png")
-    cv2.imwrite(preprocessed_path, thresh)
 
-    custom_config = r'--oem 3 --psm 6'
-    text = pytesseract.image_to_string(Image.open(preprocessed_path), lang='eng', config=custom_config)
+def load_pages(source):
+    """
+    Returns [(name, page)] for an image path, a multi-page TIFF, a BGR array
+    or a list of any of these. Single images stay paths, so pool workers
+    decode them themselves instead of receiving pickled pixels.
+    """
+    if not isinstance(source, (list, tuple)):
+        source = [source]
+
+    pages = []
+    for idx, item in enumerate(source):
+        if not isinstance(item, str):
+            pages.append((f"page_{idx + 1:04d}", item))
+            continue
+        name = os.path.splitext(os.path.basename(item))[0]
+        if item.lower().endswith(MULTI_PAGE_EXTENSIONS):
+            ok, images = cv2.imreadmulti(item)
+            if not ok:
+                raise FileNotFoundError(f"Could not read image: {item}")
+            if len(images) > 1:
+                pages.extend((f"{name}_page_{n:04d}", img) for n, img in enumerate(images, start=1))
+                continue
+        pages.append((name, item))
+    return pages
+
+
+def _init_worker(omp_thread_limit: int):
+    # tesseract is a child of this worker and inherits its environment
+    os.environ["OMP_THREAD_LIMIT"] = str(omp_thread_limit)
+
+
+def _ocr_page(page, lang: str, config: str, keep_preprocessed: bool = False):
+    """
+    Returns (text, preprocessed image or None, seconds) of one page or region.
+    """
+    start = time.time()
+    img = cv2.imread(page) if isinstance(page, str) else page
+    if img is None:
+        raise FileNotFoundError(f"Could not read image: {page}")
+    thresh = preprocess(img)
+    text = pytesseract.image_to_string(thresh, lang=lang, config=config)
+    return text, thresh if keep_preprocessed else None, time.time() - start
+
+
+def run_tesseract_batch(
+    source,
+    output_dir: str = "OCR_outputs/Tesseract",
+    workers: int = DEFAULT_WORKERS,
+    omp_thread_limit: int = DEFAULT_OMP_THREAD_LIMIT,
+    psm: int = 6,
+    lang: str = "eng",
+    save_preprocessed: bool = False,
+):
+    """
+    OCRs pages or regions across a process pool. Each page's preprocessed
+    buffer goes straight to pytesseract; OMP_THREAD_LIMIT keeps every
+    tesseract process from starting one thread per core on top of the pool.
 
+    Arguments:
+        source: path, multi-page TIFF, BGR array or list of these (see load_pages)
+        output_dir: <name>.txt is written here per page
+        workers: number of pages OCRed at the same time
+        save_preprocessed: also write <name>_preprocessed.png, for debugging
+    Output:
+        list of {"name", "text", "seconds"} in page order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pages = load_pages(source)
+    config = f"--oem 3 --psm {psm}"
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pages) or 1)),
+                             initializer=_init_worker, initargs=(omp_thread_limit,)) as executor:
+        futures = [executor.submit(_ocr_page, page, lang, config, save_preprocessed) for _, page in pages]
+        for (name, _), future in zip(pages, futures):
+            text, thresh, seconds = future.result()
+
+            with open(os.path.join(output_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+                f.write(text)
+            if save_preprocessed:
+                cv2.imwrite(os.path.join(output_dir, f"{name}_preprocessed.png"), thresh)
+
+            print(f"[Tesseract] {name}: {seconds:.2f}s")
+            results.append({"name": name, "text": text, "seconds": seconds})
+    return results
+
+
+def run_tesseract_ocr(image_path: str, output_dir: str = "OCR_outputs/Tesseract", save_preprocessed: bool = False) -> str:
+    """
+    OCRs one image in this process and returns its text.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    text, thresh, seconds = _ocr_page(image_path, "eng", "--oem 3 --psm 6", save_preprocessed)
+
+    image_name = os.path.splitext(os.path.basename(image_path))[0]
     output_txt_path = os.path.join(output_dir, f"{image_name}.txt")
     with open(output_txt_path, "w", encoding="utf-8") as f:
         f.write(text)
 
-    print(f"[Tesseract] Processed: {image_path}")
+    print(f"[Tesseract] Processed: {image_path} in {seconds:.2f}s")
     print(f"→ Text saved to: {output_txt_path}")
-    print(f"→ Preprocessed image saved to: {preprocessed_path}")
+    if save_preprocessed:
+        preprocessed_path = os.path.join(output_dir, f"{image_name}_preprocessed.png")
+        cv2.imwrite(preprocessed_path, thresh)
+        print(f"→ Preprocessed image saved to: {preprocessed_path}")
     return text
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tesseract OCR on images or multi-page TIFFs.")
+    parser.add_argument("image_paths", nargs="+")
+    parser.add_argument("--output-dir", default="OCR_outputs/Tesseract")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Number of pages OCRed in parallel.")
+    parser.add_argument("--omp-thread-limit", type=int, default=DEFAULT_OMP_THREAD_LIMIT,
+                        help="OMP_THREAD_LIMIT of each tesseract process.")
+    parser.add_argument("--psm", type=int, default=6, help="Tesseract page segmentation mode.")
+    parser.add_argument("--save-preprocessed", action="store_true")
+    args = parser.parse_args()
+
+    start = time.time()
+    results = run_tesseract_batch(
+        args.image_paths, args.output_dir, workers=args.workers,
+        omp_thread_limit=args.omp_thread_limit, psm=args.psm, save_preprocessed=args.save_preprocessed
+    )
+    print(f"[Tesseract] {len(results)} pages in {time.time() - start:.2f}s "
+          f"({sum(r['seconds'] for r in results):.2f}s of page time)")
@@ -1,11 +1,13 @@
 from __future__ import absolute_import
 
 import os
+import time
 from typing import Optional
 
 import craft_text_detector.craft_utils as craft_utils
 import craft_text_detector.file_utils as file_utils
 import craft_text_detector.image_utils as image_utils
+import craft_text_detector.onnx_utils as onnx_utils
 import craft_text_detector.predict as predict
 import craft_text_detector.torch_utils as torch_utils
 
@@ -16,7 +18,11 @@ __all__ = [
     "read_image",
     "load_craftnet_model",
     "load_refinenet_model",
+    "load_craftnet_onnx",
+    "load_refinenet_onnx",
     "get_prediction",
+    "get_prediction_tiled",
+    "get_prediction_batch",
     "export_detected_regions",
     "export_extra_results",
     "empty_cuda_cache",
@@ -26,7 +32,11 @@ __all__ = [
 read_image = image_utils.read_image
 load_craftnet_model = craft_utils.load_craftnet_model
 load_refinenet_model = craft_utils.load_refinenet_model
+load_craftnet_onnx = onnx_utils.load_craftnet_onnx
+load_refinenet_onnx = onnx_utils.load_refinenet_onnx
 get_prediction = predict.get_prediction
+get_prediction_tiled = predict.get_prediction_tiled
+get_prediction_batch = predict.get_prediction_batch
 export_detected_regions = file_utils.export_detected_regions
 export_extra_results = file_utils.export_extra_results
 empty_cuda_cache = torch_utils.empty_cuda_cache
@@ -45,6 +55,10 @@ class Craft:
         long_size=1280,
         refiner=True,
         crop_type="poly",
+        tile_size: Optional[int] = None,
+        tile_overlap=256,
+        tile_batch_size=4,
+        backend="torch",
         weight_path_craft_net: Optional[str] = None,
         weight_path_refine_net: Optional[str] = None,
     ):
@@ -60,7 +74,19 @@ class Craft:
             long_size: desired longest image size for inference
             refiner: enable link refiner
             crop_type: crop regions by detected boxes or polys ("poly" or "box")
+            tile_size: if set, images whose longest side exceeds long_size are
+                detected at native resolution in overlapping tiles of this size
+                instead of being downscaled to long_size
+            tile_overlap: overlap between neighbouring tiles in pixels
+            tile_batch_size: number of tiles per forward pass
+            backend: "torch" for the PyTorch modules, or "onnx" for graphs
+                exported by ocr/export_craft_onnx.py run with ONNX Runtime on
+                CPU (weight paths then point to the .onnx files)
         """
+        if backend not in ("torch", "onnx"):
+            raise ValueError("backend can be only 'torch' or 'onnx'")
+        if backend == "onnx" and cuda:
+            raise ValueError("the 'onnx' backend runs on CPU only, set cuda=False")
         self.craft_net = None
         self.refine_net = None
         self.output_dir = output_dir
@@ -73,6 +99,10 @@ class Craft:
         self.long_size = long_size
         self.refiner = refiner
         self.crop_type = crop_type
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.tile_batch_size = tile_batch_size
+        self.backend = backend
 
         # load craftnet
         self.load_craftnet_model(weight_path_craft_net)
@@ -84,13 +114,19 @@ class Craft:
         """
         Loads craftnet model
         """
-        self.craft_net = load_craftnet_model(self.cuda, weight_path=weight_path)
+        if self.backend == "onnx":
+            self.craft_net = load_craftnet_onnx(weight_path)
+        else:
+            self.craft_net = load_craftnet_model(self.cuda, weight_path=weight_path)
 
     def load_refinenet_model(self, weight_path: Optional[str] = None):
         """
         Loads refinenet model
         """
-        self.refine_net = load_refinenet_model(self.cuda, weight_path=weight_path)
+        if self.backend == "onnx":
+            self.refine_net = load_refinenet_onnx(weight_path)
+        else:
+            self.refine_net = load_refinenet_model(self.cuda, weight_path=weight_path)
 
     def unload_craftnet_model(self):
         """
@@ -117,7 +153,7 @@ class Craft:
                 "boxes": list of coords of points of predicted boxes,
                 "boxes_as_ratios": list of coords of points of predicted boxes as ratios of image size,
                 "polys_as_ratios": list of coords of points of predicted polys as ratios of image size,
-                "heatmaps": visualization of the detected characters/links,
+                "heatmaps": visualization of the detected characters/links, rendered on first access,
                 "text_crop_paths": list of paths of the exported text boxes/polys,
                 "times": elapsed times of the sub modules, in seconds
             }
@@ -128,16 +164,31 @@ class Craft:
             image = image_path
 
         # perform prediction
-        prediction_result = get_prediction(
-            image=image,
-            craft_net=self.craft_net,
-            refine_net=self.refine_net,
-            text_threshold=self.text_threshold,
-            link_threshold=self.link_threshold,
-            low_text=self.low_text,
-            cuda=self.cuda,
-            long_size=self.long_size,
-        )
+        img = read_image(image)
+        if self.tile_size is not None and max(img.shape[:2]) > self.long_size:
+            prediction_result = get_prediction_tiled(
+                image=img,
+                craft_net=self.craft_net,
+                refine_net=self.refine_net,
+                text_threshold=self.text_threshold,
+                link_threshold=self.link_threshold,
+                low_text=self.low_text,
+                cuda=self.cuda,
+                tile_size=self.tile_size,
+                tile_overlap=self.tile_overlap,
+                tile_batch_size=self.tile_batch_size,
+            )
+        else:
+            prediction_result = get_prediction(
+                image=img,
+                craft_net=self.craft_net,
+                refine_net=self.refine_net,
+                text_threshold=self.text_threshold,
+                link_threshold=self.link_threshold,
+                low_text=self.low_text,
+                cuda=self.cuda,
+                long_size=self.long_size,
+            )
 
         # arange regions
         if self.crop_type == "box":
@@ -176,3 +227,47 @@ class Craft:
 
         # return prediction results
         return prediction_result
+
+    def detect_text_batch(self, images, batch_size: int = 8):
+        """
+        Detects text on many images, batching pages of similar shape into one
+        forward pass. Images larger than long_size go through the tiled path
+        one by one when tile_size is set. Detected regions are not exported.
+
+        Arguments:
+            images: list of image paths, numpy arrays or PIL images
+            batch_size: maximum number of images per forward pass
+
+        Output:
+            (list of detect_text results in input order, throughput in pages
+            per second)
+        """
+        start = time.time()
+        images = [read_image(image) for image in images]
+        tiled = {
+            i for i, img in enumerate(images)
+            if self.tile_size is not None and max(img.shape[:2]) > self.long_size
+        }
+        batched = [i for i in range(len(images)) if i not in tiled]
+
+        results = [None] * len(images)
+        for i in sorted(tiled):
+            results[i] = self.detect_text(images[i])
+        batch_results = get_prediction_batch(
+            images=[images[i] for i in batched],
+            craft_net=self.craft_net,
+            refine_net=self.refine_net,
+            text_threshold=self.text_threshold,
+            link_threshold=self.link_threshold,
+            low_text=self.low_text,
+            cuda=self.cuda,
+            long_size=self.long_size,
+            batch_size=batch_size,
+        )
+        for i, result in zip(batched, batch_results):
+            result["text_crop_paths"] = []
+            results[i] = result
+
+        elapsed = time.time() - start
+        pages_per_second = len(images) / elapsed if elapsed > 0 else float("inf")
+        return results, pages_per_second
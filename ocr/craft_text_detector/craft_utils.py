@@ -34,11 +34,35 @@ def copyStateDict(state_dict):
     return new_state_dict
 
 
-def load_craftnet_model(
-        cuda: bool = False,
-        weight_path: Optional[Union[str, Path]] = None
-):
-    # get craft net path
+def load_state_dict(weight_path: str):
+    """
+    Loads a .pth checkpoint through a safetensors copy next to it. The copy is
+    written on first use, and again whenever the .pth is newer than it;
+    otherwise the weights are memory-mapped instead of unpickled, which makes
+    process start-up much faster. Falls back to torch.load when safetensors is
+    not installed.
+    """
+    try:
+        from safetensors.torch import load_file, save_file
+    except ImportError:
+        return copyStateDict(torch_utils.load(weight_path, map_location="cpu"))
+
+    safetensors_path = os.path.splitext(weight_path)[0] + ".safetensors"
+    if (not os.path.isfile(safetensors_path)
+            or os.path.getmtime(weight_path) > os.path.getmtime(safetensors_path)):
+        state_dict = copyStateDict(torch_utils.load(weight_path, map_location="cpu"))
+        tmp_path = safetensors_path + ".tmp"
+        save_file({k: v.contiguous() for k, v in state_dict.items()}, tmp_path)
+        os.replace(tmp_path, safetensors_path)
+        return state_dict
+    return load_file(safetensors_path)
+
+
+def craftnet_weight_path(weight_path: Optional[Union[str, Path]] = None) -> str:
+    """
+    Resolved path of the craft net checkpoint, by default under
+    ~/.craft_text_detector/weights.
+    """
     if weight_path is None:
         home_path = str(Path.home())
         weight_path = Path(
@@ -47,9 +71,16 @@ def load_craftnet_model(
             "weights",
             "craft_mlt_25k.pth"
         )
-    weight_path = Path(weight_path).resolve()
-    weight_path.parent.mkdir(exist_ok=True, parents=True)
-    weight_path = str(weight_path)
+    return str(Path(weight_path).resolve())
+
+
+def load_craftnet_model(
+        cuda: bool = False,
+        weight_path: Optional[Union[str, Path]] = None
+):
+    # get craft net path
+    weight_path = craftnet_weight_path(weight_path)
+    Path(weight_path).parent.mkdir(exist_ok=True, parents=True)
 
     # load craft net
     from craft_text_detector.models.craftnet import CraftNet
@@ -64,16 +95,11 @@ def load_craftnet_model(
         file_utils.download(url=url, save_path=weight_path)
 
     # arange device
+    craft_net.load_state_dict(load_state_dict(weight_path))
     if cuda:
-        craft_net.load_state_dict(copyStateDict(torch_utils.load(weight_path)))
-
         craft_net = craft_net.cuda()
         craft_net = torch_utils.DataParallel(craft_net)
         torch_utils.cudnn_benchmark = False
-    else:
-        craft_net.load_state_dict(
-            copyStateDict(torch_utils.load(weight_path, map_location="cpu"))
-        )
     craft_net.eval()
     return craft_net
 
@@ -108,16 +134,11 @@ def load_refinenet_model(
         file_utils.download(url=url, save_path=weight_path)
 
     # arange device
+    refine_net.load_state_dict(load_state_dict(weight_path))
     if cuda:
-        refine_net.load_state_dict(copyStateDict(torch_utils.load(weight_path)))
-
         refine_net = refine_net.cuda()
         refine_net = torch_utils.DataParallel(refine_net)
         torch_utils.cudnn_benchmark = False
-    else:
-        refine_net.load_state_dict(
-            copyStateDict(torch_utils.load(weight_path, map_location="cpu"))
-        )
     refine_net.eval()
     return refine_net
 
@@ -137,6 +158,14 @@ def getDetBoxes_core(textmap, linkmap, text_threshold, link_threshold, low_text)
         text_score_comb.astype(np.uint8), connectivity=4
     )
 
+    # maximum text score of every label in one pass, instead of
+    # np.max(textmap[labels == k]) over the whole map per component
+    label_max = np.full(nLabels, -np.inf, dtype=np.float32)
+    np.maximum.at(label_max, labels.ravel(), textmap.ravel())
+
+    # link area (removed from every segmentation map)
+    link_area = np.logical_and(link_score == 1, text_score == 0)
+
     det = []
     mapper = []
     for k in range(1, nLabels):
@@ -146,16 +175,9 @@ def getDetBoxes_core(textmap, linkmap, text_threshold, link_threshold, low_text)
             continue
 
         # thresholding
-        if np.max(textmap[labels == k]) < text_threshold:
+        if label_max[k] < text_threshold:
             continue
 
-        # make segmentation map
-        segmap = np.zeros(textmap.shape, dtype=np.uint8)
-        segmap[labels == k] = 255
-
-        # remove link area
-        segmap[np.logical_and(link_score == 1, text_score == 0)] = 0
-
         x, y = stats[k, cv2.CC_STAT_LEFT], stats[k, cv2.CC_STAT_TOP]
         w, h = stats[k, cv2.CC_STAT_WIDTH], stats[k, cv2.CC_STAT_HEIGHT]
         niter = int(math.sqrt(size * min(w, h) / (w * h)) * 2)
@@ -169,12 +191,21 @@ def getDetBoxes_core(textmap, linkmap, text_threshold, link_threshold, low_text)
             ex = img_w
         if ey >= img_h:
             ey = img_h
+
+        # make segmentation map of the dilation ROI only; the component
+        # cannot reach outside its bounding box
+        segmap = np.zeros((ey - sy, ex - sx), dtype=np.uint8)
+        segmap[labels[sy:ey, sx:ex] == k] = 255
+
+        # remove link area
+        segmap[link_area[sy:ey, sx:ex]] = 0
+
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1 + niter, 1 + niter))
-        segmap[sy:ey, sx:ex] = cv2.dilate(segmap[sy:ey, sx:ex], kernel)
+        segmap = cv2.dilate(segmap, kernel)
 
         # make box
         np_temp = np.roll(np.array(np.where(segmap != 0)), 1, axis=0)
-        np_contours = np_temp.transpose().reshape(-1, 2)
+        np_contours = np_temp.transpose().reshape(-1, 2) + np.array([sx, sy])
         rectangle = cv2.minAreaRect(np_contours)
         box = cv2.boxPoints(rectangle)
 
@@ -209,6 +240,24 @@ def getDetBoxes_core(textmap, linkmap, text_threshold, link_threshold, low_text)
     return det, labels, mapper
 
 
+def _line_hits(mask, x0, y0, x1, y1):
+    """
+    Whether a 1px line between two points touches mask. The line is drawn on
+    its bounding box clipped to the mask only, instead of a full-size canvas;
+    the box keeps the image borders in place, so cv2.line clips and
+    rasterizes exactly the same pixels.
+    """
+    h, w = mask.shape
+    left, right = max(min(x0, x1), 0), min(max(x0, x1), w - 1)
+    top, bottom = max(min(y0, y1), 0), min(max(y0, y1), h - 1)
+    if left > right or top > bottom:
+        return False
+
+    line_img = np.zeros((bottom - top + 1, right - left + 1), dtype=np.uint8)
+    cv2.line(line_img, (x0 - left, y0 - top), (x1 - left, y1 - top), 1, thickness=1)
+    return bool(np.any(mask[top:bottom + 1, left:right + 1] & (line_img != 0)))
+
+
 def getPoly_core(boxes, labels, mapper, linkmap):
     # configs
     num_cp = 5
@@ -244,17 +293,14 @@ def getPoly_core(boxes, labels, mapper, linkmap):
         word_label[word_label > 0] = 1
 
         """ Polygon generation """
-        # find top/bottom contours
-        cp = []
-        max_len = -1
-        for i in range(w):
-            region = np.where(word_label[:, i] != 0)[0]
-            if len(region) < 2:
-                continue
-            cp.append((i, region[0], region[-1]))
-            length = region[-1] - region[0] + 1
-            if length > max_len:
-                max_len = length
+        # find top/bottom contours: first and last labelled row of every
+        # column that has at least two labelled pixels
+        mask = word_label != 0
+        columns = np.flatnonzero(mask.sum(axis=0) >= 2)
+        tops = mask[:, columns].argmax(axis=0)
+        bottoms = mask.shape[0] - 1 - mask[::-1, columns].argmax(axis=0)
+        cp = list(zip(columns.tolist(), tops.tolist(), bottoms.tolist()))
+        max_len = int((bottoms - tops).max()) + 1 if len(columns) else -1
 
         # pass if max_len is similar to h
         if h * max_len_ratio < max_len:
@@ -339,35 +385,19 @@ def getPoly_core(boxes, labels, mapper, linkmap):
         for r in np.arange(0.5, max_r, step_r):
             dx = 2 * half_char_h * r
             if not isSppFound:
-                line_img = np.zeros(word_label.shape, dtype=np.uint8)
                 dy = grad_s * dx
                 p = np.array(new_pp[0]) - np.array([dx, dy, dx, dy])
-                cv2.line(
-                    line_img,
-                    (int(p[0]), int(p[1])),
-                    (int(p[2]), int(p[3])),
-                    1,
-                    thickness=1,
-                )
                 if (
-                    np.sum(np.logical_and(word_label, line_img)) == 0
+                    not _line_hits(mask, int(p[0]), int(p[1]), int(p[2]), int(p[3]))
                     or r + 2 * step_r >= max_r
                 ):
                     spp = p
                     isSppFound = True
             if not isEppFound:
-                line_img = np.zeros(word_label.shape, dtype=np.uint8)
                 dy = grad_e * dx
                 p = np.array(new_pp[-1]) + np.array([dx, dy, dx, dy])
-                cv2.line(
-                    line_img,
-                    (int(p[0]), int(p[1])),
-                    (int(p[2]), int(p[3])),
-                    1,
-                    thickness=1,
-                )
                 if (
-                    np.sum(np.logical_and(word_label, line_img)) == 0
+                    not _line_hits(mask, int(p[0]), int(p[1]), int(p[2]), int(p[3]))
                     or r + 2 * step_r >= max_r
                 ):
                     epp = p
@@ -10,12 +10,12 @@ import numpy as np
 def read_image(image):
     if type(image) == str:
         img = cv2.imread(image)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
 
     elif type(image) == bytes:
         nparr = np.frombuffer(image, np.uint8)
         img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
 
     elif type(image) == np.ndarray:
         if len(image.shape) == 2:  # grayscale
@@ -29,10 +29,11 @@ def read_image(image):
 
 
 def normalizeMeanVariance(
-    in_img, mean=(0.485, 0.456, 0.406), variance=(0.229, 0.224, 0.225)
+    in_img, mean=(0.485, 0.456, 0.406), variance=(0.229, 0.224, 0.225), copy=True
 ):
     # should be RGB order
-    img = in_img.copy().astype(np.float32)
+    # copy=False normalizes a float32 input in place instead of copying it
+    img = in_img.astype(np.float32, copy=copy)
 
     img -= np.array(
         [mean[0] * 255.0, mean[1] * 255.0, mean[2] * 255.0], dtype=np.float32
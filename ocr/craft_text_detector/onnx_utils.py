@@ -0,0 +1,128 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import craft_text_detector.torch_utils as torch_utils
+
+WEIGHTS_DIR = Path(Path.home(), ".craft_text_detector", "weights")
+CRAFTNET_ONNX_PATH = WEIGHTS_DIR / "craft_mlt_25k.onnx"
+REFINENET_ONNX_PATH = WEIGHTS_DIR / "craft_refiner_CTW1500.onnx"
+DEFAULT_OPSET = 17
+
+
+def _inference_session(weight_path):
+    try:
+        import onnxruntime
+    except ImportError:
+        raise ImportError(
+            "The 'onnx' backend needs onnxruntime; install it with 'pip install onnxruntime'."
+        )
+
+    if not os.path.isfile(weight_path):
+        raise FileNotFoundError(
+            "ONNX graph not found at {}. Export it first with "
+            "'python ocr/export_craft_onnx.py'.".format(weight_path)
+        )
+    return onnxruntime.InferenceSession(
+        str(weight_path), providers=["CPUExecutionProvider"]
+    )
+
+
+class OnnxCraftNet:
+    """
+    CraftNet exported to ONNX, run by ONNX Runtime on CPU. Called like the
+    torch module: takes a [b, c, h, w] tensor and returns (y, feature).
+    """
+
+    def __init__(self, weight_path):
+        self.session = _inference_session(weight_path)
+
+    def __call__(self, x):
+        y, feature = self.session.run(None, {"image": x.cpu().numpy()})
+        return torch_utils.from_numpy(y), torch_utils.from_numpy(feature)
+
+
+class OnnxRefineNet:
+    """
+    RefineNet exported to ONNX; called like the torch module with (y, feature).
+    """
+
+    def __init__(self, weight_path):
+        self.session = _inference_session(weight_path)
+
+    def __call__(self, y, feature):
+        (y_refiner,) = self.session.run(
+            None, {"y": y.cpu().numpy(), "feature": feature.cpu().numpy()}
+        )
+        return torch_utils.from_numpy(y_refiner)
+
+
+def load_craftnet_onnx(weight_path: Optional[Union[str, Path]] = None):
+    return OnnxCraftNet(weight_path or CRAFTNET_ONNX_PATH)
+
+
+def load_refinenet_onnx(weight_path: Optional[Union[str, Path]] = None):
+    return OnnxRefineNet(weight_path or REFINENET_ONNX_PATH)
+
+
+def export_craftnet_onnx(
+    onnx_path: Optional[Union[str, Path]] = None,
+    weight_path: Optional[Union[str, Path]] = None,
+    opset: int = DEFAULT_OPSET,
+):
+    """
+    Exports CraftNet with dynamic batch, height and width axes.
+    """
+    import torch
+
+    from craft_text_detector.craft_utils import load_craftnet_model
+
+    onnx_path = Path(onnx_path or CRAFTNET_ONNX_PATH)
+    onnx_path.parent.mkdir(exist_ok=True, parents=True)
+    craft_net = load_craftnet_model(cuda=False, weight_path=weight_path)
+    torch.onnx.export(
+        craft_net,
+        torch.zeros(1, 3, 640, 640),
+        str(onnx_path),
+        input_names=["image"],
+        output_names=["y", "feature"],
+        dynamic_axes={
+            "image": {0: "batch", 2: "height", 3: "width"},
+            "y": {0: "batch", 1: "map_height", 2: "map_width"},
+            "feature": {0: "batch", 2: "map_height", 3: "map_width"},
+        },
+        opset_version=opset,
+    )
+    return str(onnx_path)
+
+
+def export_refinenet_onnx(
+    onnx_path: Optional[Union[str, Path]] = None,
+    weight_path: Optional[Union[str, Path]] = None,
+    opset: int = DEFAULT_OPSET,
+):
+    """
+    Exports RefineNet with dynamic batch, height and width axes. Its inputs are
+    CraftNet's outputs for a 640x640 image: y [b, h, w, 2], feature [b, 32, h, w].
+    """
+    import torch
+
+    from craft_text_detector.craft_utils import load_refinenet_model
+
+    onnx_path = Path(onnx_path or REFINENET_ONNX_PATH)
+    onnx_path.parent.mkdir(exist_ok=True, parents=True)
+    refine_net = load_refinenet_model(cuda=False, weight_path=weight_path)
+    torch.onnx.export(
+        refine_net,
+        (torch.zeros(1, 320, 320, 2), torch.zeros(1, 32, 320, 320)),
+        str(onnx_path),
+        input_names=["y", "feature"],
+        output_names=["y_refiner"],
+        dynamic_axes={
+            "y": {0: "batch", 1: "map_height", 2: "map_width"},
+            "feature": {0: "batch", 2: "map_height", 3: "map_width"},
+            "y_refiner": {0: "batch", 1: "map_height", 2: "map_width"},
+        },
+        opset_version=opset,
+    )
+    return str(onnx_path)
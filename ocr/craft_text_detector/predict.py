@@ -1,5 +1,6 @@
 import os
 import time
+from collections.abc import MutableMapping
 
 import cv2
 import numpy as np
@@ -9,6 +10,36 @@ import craft_text_detector.image_utils as image_utils
 import craft_text_detector.torch_utils as torch_utils
 
 
+class LazyDict(MutableMapping):
+    """
+    Dict whose callable values are computed on first access and then cached.
+    """
+
+    def __init__(self, **items):
+        self._items = items
+
+    def __getitem__(self, key):
+        value = self._items[key]
+        if callable(value):
+            value = self._items[key] = value()
+        return value
+
+    def __setitem__(self, key, value):
+        self._items[key] = value
+
+    def __delitem__(self, key):
+        del self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"LazyDict({sorted(self._items)})"
+
+
 def get_prediction(
     image,
     craft_net,
@@ -38,7 +69,7 @@ def get_prediction(
          "boxes": list of coords of points of predicted boxes,
          "boxes_as_ratios": list of coords of points of predicted boxes as ratios of image size,
          "polys_as_ratios": list of coords of points of predicted polys as ratios of image size,
-         "heatmaps": visualizations of the detected characters/links,
+         "heatmaps": visualizations of the detected characters/links, rendered on first access,
          "times": elapsed times of the sub modules, in seconds}
     """
     t0 = time.time()
@@ -55,7 +86,8 @@ def get_prediction(
     t0 = time.time()
 
     # preprocessing
-    x = image_utils.normalizeMeanVariance(img_resized)
+    # img_resized is a fresh float32 canvas, normalize it in place
+    x = image_utils.normalizeMeanVariance(img_resized, copy=False)
     x = torch_utils.from_numpy(x).permute(2, 0, 1)  # [h, w, c] to [c, h, w]
     x = torch_utils.Variable(x.unsqueeze(0))  # [c, h, w] to [b, c, h, w]
     if cuda:
@@ -82,6 +114,40 @@ def get_prediction(
     t0 = time.time()
 
     # Post-processing
+    result = _postprocess(
+        image, score_text, score_link, ratio_w, ratio_h,
+        text_threshold, link_threshold, low_text, poly
+    )
+    postprocess_time = time.time() - t0
+
+    times = {
+        "resize_time": resize_time,
+        "preprocessing_time": preprocessing_time,
+        "craftnet_time": craftnet_time,
+        "refinenet_time": refinenet_time,
+        "postprocess_time": postprocess_time,
+    }
+
+    result["times"] = times
+    return result
+
+
+def _postprocess(
+    image,
+    score_text,
+    score_link,
+    ratio_w,
+    ratio_h,
+    text_threshold,
+    link_threshold,
+    low_text,
+    poly,
+):
+    """
+    Turns score maps into boxes, polys (in image coordinates and as ratios of
+    the image size) and heatmaps. The ratios and heatmaps are computed on
+    first access.
+    """
     boxes, polys = craft_utils.getDetBoxes(
         score_text, score_link, text_threshold, link_threshold, low_text, poly
     )
@@ -97,39 +163,250 @@ def get_prediction(
     img_height = image.shape[0]
     img_width = image.shape[1]
 
-    # calculate box coords as ratios to image size
-    boxes_as_ratio = []
-    for box in boxes:
-        boxes_as_ratio.append(box / [img_width, img_height])
-    boxes_as_ratio = np.array(boxes_as_ratio)
+    def as_ratios(coords):
+        # coords as ratios to image size
+        return np.array([c / [img_width, img_height] for c in coords])
+
+    return LazyDict(
+        boxes=boxes,
+        boxes_as_ratios=lambda: as_ratios(boxes),
+        polys=polys,
+        polys_as_ratios=lambda: as_ratios(polys),
+        heatmaps=LazyDict(
+            text_score_heatmap=lambda: image_utils.cvt2HeatmapImg(score_text),
+            link_score_heatmap=lambda: image_utils.cvt2HeatmapImg(score_link),
+        ),
+    )
+
+
+def _tile_starts(length: int, tile: int, stride: int):
+    """
+    Start offsets of tiles of size tile covering [0, length); the last tile
+    is aligned to the end.
+    """
+    if length <= tile:
+        return [0]
+    starts = list(range(0, length - tile, stride))
+    starts.append(length - tile)
+    return starts
+
+
+def get_prediction_tiled(
+    image,
+    craft_net,
+    refine_net=None,
+    text_threshold: float = 0.7,
+    link_threshold: float = 0.4,
+    low_text: float = 0.4,
+    cuda: bool = False,
+    tile_size: int = 1280,
+    tile_overlap: int = 256,
+    tile_batch_size: int = 4,
+    poly: bool = True,
+):
+    """
+    Runs CRAFT at the native image resolution over overlapping tiles, so small
+    handwriting on large photos is not lost to downscaling and peak memory is
+    bounded by tile_batch_size tiles instead of the whole image.
+
+    Each tile keeps the score map of its center; the seams between tiles fall
+    inside overlaps that both neighbours saw with context, and boxes are
+    extracted once from the stitched maps, so text crossing a seam yields a
+    single box.
 
-    # calculate poly coords as ratios to image size
-    polys_as_ratio = []
-    for poly in polys:
-        polys_as_ratio.append(poly / [img_width, img_height])
-    polys_as_ratio = np.array(polys_as_ratio)
+    Arguments:
+        tile_size: tile side in pixels (rounded up to a multiple of 32)
+        tile_overlap: overlap between neighbouring tiles in pixels (rounded up
+            to a multiple of 32); should exceed the tallest text line
+        tile_batch_size: number of tiles per forward pass
+        other arguments and output as in get_prediction
+    """
+    tile_size = -(-tile_size // 32) * 32
+    tile_overlap = -(-tile_overlap // 32) * 32
+    if tile_overlap >= tile_size:
+        raise ValueError("tile_overlap must be smaller than tile_size")
+    t0 = time.time()
+
+    # read/convert image
+    image = image_utils.read_image(image)
+    img_height, img_width = image.shape[:2]
+
+    # pad to a multiple of 32 like resize_aspect_ratio does
+    padded_h = -(-img_height // 32) * 32
+    padded_w = -(-img_width // 32) * 32
+    padded = np.zeros((padded_h, padded_w, 3), dtype=image.dtype)
+    padded[:img_height, :img_width, :] = image
+
+    tile_h = min(tile_size, padded_h)
+    tile_w = min(tile_size, padded_w)
+    stride = tile_size - tile_overlap
+    margin = tile_overlap // 2
+    ys = _tile_starts(padded_h, tile_h, stride)
+    xs = _tile_starts(padded_w, tile_w, stride)
+    tiles = [(y0, x0) for y0 in ys for x0 in xs]
+    preprocessing_time = time.time() - t0
+
+    # score maps are half the input resolution
+    score_text = np.zeros((padded_h // 2, padded_w // 2), dtype=np.float32)
+    score_link = np.zeros((padded_h // 2, padded_w // 2), dtype=np.float32)
+    craftnet_time = 0.0
+    refinenet_time = 0.0
+
+    for i in range(0, len(tiles), tile_batch_size):
+        t0 = time.time()
+        batch = tiles[i:i + tile_batch_size]
+        x_batch = np.stack([
+            image_utils.normalizeMeanVariance(padded[y0:y0 + tile_h, x0:x0 + tile_w]) for y0, x0 in batch
+        ])
+        x_batch = torch_utils.from_numpy(x_batch).permute(0, 3, 1, 2)  # [b, h, w, c] to [b, c, h, w]
+        if cuda:
+            x_batch = x_batch.cuda()
+
+        with torch_utils.no_grad():
+            y, feature = craft_net(x_batch)
+        tile_text = y[:, :, :, 0].cpu().data.numpy()
+        tile_link = y[:, :, :, 1].cpu().data.numpy()
+        craftnet_time += time.time() - t0
+        t0 = time.time()
+
+        if refine_net is not None:
+            with torch_utils.no_grad():
+                y_refiner = refine_net(y, feature)
+            tile_link = y_refiner[:, :, :, 0].cpu().data.numpy()
+        refinenet_time += time.time() - t0
 
-    text_score_heatmap = image_utils.cvt2HeatmapImg(score_text)
-    link_score_heatmap = image_utils.cvt2HeatmapImg(score_link)
+        # keep the center of each tile; tiles at the image border keep that side
+        for k, (y0, x0) in enumerate(batch):
+            top = y0 + (margin if y0 > 0 else 0)
+            bottom = y0 + tile_h - (margin if y0 + tile_h < padded_h else 0)
+            left = x0 + (margin if x0 > 0 else 0)
+            right = x0 + tile_w - (margin if x0 + tile_w < padded_w else 0)
+            dst = (slice(top // 2, bottom // 2), slice(left // 2, right // 2))
+            src = (slice((top - y0) // 2, (bottom - y0) // 2), slice((left - x0) // 2, (right - x0) // 2))
+            score_text[dst] = tile_text[k][src]
+            score_link[dst] = tile_link[k][src]
 
+    t0 = time.time()
+    result = _postprocess(
+        image, score_text, score_link, 1, 1,
+        text_threshold, link_threshold, low_text, poly
+    )
     postprocess_time = time.time() - t0
 
-    times = {
-        "resize_time": resize_time,
+    result["times"] = {
+        "resize_time": 0.0,
         "preprocessing_time": preprocessing_time,
         "craftnet_time": craftnet_time,
         "refinenet_time": refinenet_time,
         "postprocess_time": postprocess_time,
     }
+    return result
 
-    return {
-        "boxes": boxes,
-        "boxes_as_ratios": boxes_as_ratio,
-        "polys": polys,
-        "polys_as_ratios": polys_as_ratio,
-        "heatmaps": {
-            "text_score_heatmap": text_score_heatmap,
-            "link_score_heatmap": link_score_heatmap,
-        },
-        "times": times,
-    }
+
+def _resized_shape(height: int, width: int, long_size: int):
+    """
+    Shape of the image resize_aspect_ratio returns, before its 32 px padding.
+    """
+    ratio = long_size / max(height, width)
+    return int(height * ratio), int(width * ratio)
+
+
+def get_prediction_batch(
+    images,
+    craft_net,
+    refine_net=None,
+    text_threshold: float = 0.7,
+    link_threshold: float = 0.4,
+    low_text: float = 0.4,
+    cuda: bool = False,
+    long_size: int = 1280,
+    batch_size: int = 8,
+    bucket_size: int = 128,
+    poly: bool = True,
+):
+    """
+    Detects text on many images with one CraftNet/RefineNet forward pass per
+    batch instead of one per image.
+
+    Every image is resized as in get_prediction, then padded up to a shape
+    bucket (multiples of bucket_size) so pages of similar size share a batch.
+    Score maps are cropped back to each image's own canvas before
+    post-processing, so results match get_prediction up to the extra padding.
+
+    Arguments:
+        images: list of image paths, numpy arrays or PIL images
+        batch_size: maximum number of images per forward pass
+        bucket_size: granularity of the padded batch shapes, multiple of 32
+        other arguments as in get_prediction
+    Output:
+        list with one get_prediction result per image, in input order; the
+        times of each batch are split evenly over its images
+    """
+    pages = [image_utils.read_image(image) for image in images]
+
+    # bucket by the resized shape; pages are only resized when their batch runs
+    buckets = {}
+    for index, image in enumerate(pages):
+        height, width = _resized_shape(image.shape[0], image.shape[1], long_size)
+        shape = (-(-height // bucket_size) * bucket_size, -(-width // bucket_size) * bucket_size)
+        buckets.setdefault(shape, []).append(index)
+
+    results = [None] * len(pages)
+    for (bucket_h, bucket_w), indices in buckets.items():
+        for i in range(0, len(indices), batch_size):
+            batch = indices[i:i + batch_size]
+
+            # resize each page straight into the batch
+            t0 = time.time()
+            x = np.zeros((len(batch), bucket_h, bucket_w, 3), dtype=np.float32)
+            canvases = []
+            for k, index in enumerate(batch):
+                img_resized, target_ratio, _ = image_utils.resize_aspect_ratio(
+                    pages[index], long_size, interpolation=cv2.INTER_LINEAR
+                )
+                x[k, :img_resized.shape[0], :img_resized.shape[1]] = img_resized
+                canvases.append((img_resized.shape[0] // 2, img_resized.shape[1] // 2, 1 / target_ratio))
+            resize_time = (time.time() - t0) / len(batch)
+
+            # preprocessing
+            t0 = time.time()
+            x = image_utils.normalizeMeanVariance(x, copy=False)
+            x = torch_utils.from_numpy(x).permute(0, 3, 1, 2)  # [b, h, w, c] to [b, c, h, w]
+            if cuda:
+                x = x.cuda()
+            preprocessing_time = (time.time() - t0) / len(batch)
+
+            # forward pass
+            t0 = time.time()
+            with torch_utils.no_grad():
+                y, feature = craft_net(x)
+            score_texts = y[:, :, :, 0].cpu().data.numpy()
+            score_links = y[:, :, :, 1].cpu().data.numpy()
+            craftnet_time = (time.time() - t0) / len(batch)
+
+            # refine link
+            t0 = time.time()
+            if refine_net is not None:
+                with torch_utils.no_grad():
+                    y_refiner = refine_net(y, feature)
+                score_links = y_refiner[:, :, :, 0].cpu().data.numpy()
+            refinenet_time = (time.time() - t0) / len(batch)
+
+            for k, index in enumerate(batch):
+                t0 = time.time()
+                map_h, map_w, ratio = canvases[k]
+                # copies, so a kept result does not hold the whole batch's maps
+                result = _postprocess(
+                    pages[index], score_texts[k, :map_h, :map_w].copy(), score_links[k, :map_h, :map_w].copy(),
+                    ratio, ratio, text_threshold, link_threshold, low_text, poly
+                )
+                result["times"] = {
+                    "resize_time": resize_time,
+                    "preprocessing_time": preprocessing_time,
+                    "craftnet_time": craftnet_time,
+                    "refinenet_time": refinenet_time,
+                    "postprocess_time": time.time() - t0,
+                }
+                results[index] = result
+
+    return results
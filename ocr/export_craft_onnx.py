@@ -0,0 +1,26 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from craft_text_detector.onnx_utils import (
+    CRAFTNET_ONNX_PATH,
+    DEFAULT_OPSET,
+    REFINENET_ONNX_PATH,
+    export_craftnet_onnx,
+    export_refinenet_onnx,
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export CRAFT CraftNet/RefineNet to ONNX for the 'onnx' backend.")
+    parser.add_argument('--craftnet-output', default=str(CRAFTNET_ONNX_PATH), help="Where to write the CraftNet graph")
+    parser.add_argument('--refinenet-output', default=str(REFINENET_ONNX_PATH), help="Where to write the RefineNet graph")
+    parser.add_argument('--craftnet-weights', help="CraftNet .pth weights (downloaded if omitted)")
+    parser.add_argument('--refinenet-weights', help="RefineNet .pth weights (downloaded if omitted)")
+    parser.add_argument('--opset', type=int, default=DEFAULT_OPSET, help="ONNX opset version")
+    args = parser.parse_args()
+
+    path = export_craftnet_onnx(args.craftnet_output, args.craftnet_weights, args.opset)
+    print(f"CraftNet exported to {path}")
+    path = export_refinenet_onnx(args.refinenet_output, args.refinenet_weights, args.opset)
+    print(f"RefineNet exported to {path}")
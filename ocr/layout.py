@@ -0,0 +1,174 @@
+import bisect
+import math
+
+import cv2
+import numpy as np
+
+MIN_BOX_SIZE = 10
+MAX_SKEW = math.radians(30)
+MIN_DESKEW = math.radians(0.5)
+LINE_TOLERANCE = 0.5
+COLUMN_GAP = 2.0
+
+
+class TextLine:
+    """
+    One text line: indices of its word boxes in reading order and its extent
+    (x_min, y_min, x_max, y_max) in the deskewed frame.
+    """
+
+    def __init__(self, column: int, boxes, bounds):
+        self.column = column
+        self.boxes = boxes
+        self.bounds = bounds
+
+
+def _rotation(skew: float):
+    c, s = math.cos(skew), math.sin(skew)
+    # image -> deskewed frame: x' = x cos + y sin, y' = -x sin + y cos
+    return np.array([[c, s], [-s, c]], dtype=np.float64)
+
+
+def estimate_skew(boxes) -> float:
+    """
+    Median angle (radians, image y axis pointing down) of the top edges of the
+    elongated word boxes; square-ish boxes carry no reliable direction.
+    """
+    angles = []
+    for box in boxes:
+        box = np.asarray(box, dtype=np.float64)
+        dx, dy = box[1] - box[0]
+        height = np.linalg.norm(box[2] - box[1])
+        if math.hypot(dx, dy) < 2 * height:
+            continue
+        angle = math.atan2(dy, dx)
+        if abs(angle) <= MAX_SKEW:
+            angles.append(angle)
+    return float(np.median(angles)) if angles else 0.0
+
+
+def _columns(extents, order, median_h: float):
+    """
+    Splits boxes (sorted by x_min) into columns wherever a vertical gap wider
+    than COLUMN_GAP line heights separates them on the whole page.
+    """
+    columns = [[]]
+    right = None
+    for i in order:
+        x_min, _, x_max, _ = extents[i]
+        if right is not None and x_min - right > COLUMN_GAP * median_h:
+            columns.append([])
+        columns[-1].append(i)
+        right = x_max if right is None else max(right, x_max)
+    return columns
+
+
+def _lines(extents, members):
+    """
+    Clusters the boxes of one column into lines. Boxes are visited by
+    vertical center; open lines are kept sorted by center so the nearest one
+    is found by bisection, giving O(n log n) overall.
+    """
+    centers = []  # sorted (center, line index)
+    lines = []  # [sum of centers, sum of heights, count, box indices]
+    for i in sorted(members, key=lambda i: (extents[i][1] + extents[i][3]) / 2):
+        _, y_min, _, y_max = extents[i]
+        cy, h = (y_min + y_max) / 2, y_max - y_min
+
+        best = None
+        pos = bisect.bisect_left(centers, (cy, -1))
+        for j in (pos - 1, pos):
+            if 0 <= j < len(centers):
+                center, index = centers[j]
+                line_h = lines[index][1] / lines[index][2]
+                distance = abs(cy - center)
+                if distance <= LINE_TOLERANCE * max(h, line_h) and (best is None or distance < best[0]):
+                    best = (distance, j, index)
+
+        if best is None:
+            lines.append([cy, h, 1, [i]])
+            bisect.insort(centers, (cy, len(lines) - 1))
+            continue
+
+        _, j, index = best
+        line = lines[index]
+        line[0] += cy
+        line[1] += h
+        line[2] += 1
+        line[3].append(i)
+        del centers[j]
+        bisect.insort(centers, (line[0] / line[2], index))
+
+    return [line[3] for line in sorted(lines, key=lambda line: line[0] / line[2])]
+
+
+def group_lines(boxes, min_size: int = MIN_BOX_SIZE):
+    """
+    Groups CRAFT word boxes into text lines in reading order: columns left to
+    right, lines top to bottom, words left to right. Boxes are compared in a
+    frame rotated by the estimated page skew, so slanted handwriting stays on
+    one line.
+
+    Arguments:
+        boxes: CRAFT boxes, each 4 corner points clockwise from top-left
+        min_size: boxes narrower or lower than this many pixels are dropped
+    Output:
+        (list of TextLine, skew in radians)
+    """
+    kept = []
+    for index, box in enumerate(boxes):
+        box = np.asarray(box, dtype=np.float64)
+        width, height = np.ptp(box, axis=0)
+        if width >= min_size and height >= min_size:
+            kept.append(index)
+    if not kept:
+        return [], 0.0
+
+    skew = estimate_skew([boxes[i] for i in kept])
+    rotation = _rotation(skew)
+    extents = {}
+    for index in kept:
+        corners = np.asarray(boxes[index], dtype=np.float64) @ rotation.T
+        extents[index] = (*corners.min(axis=0), *corners.max(axis=0))
+
+    median_h = float(np.median([extents[i][3] - extents[i][1] for i in kept]))
+    lines = []
+    for column, members in enumerate(_columns(extents, sorted(kept, key=lambda i: extents[i][0]), median_h)):
+        for line_boxes in _lines(extents, members):
+            line_boxes.sort(key=lambda i: extents[i][0])
+            bounds = (
+                min(extents[i][0] for i in line_boxes),
+                min(extents[i][1] for i in line_boxes),
+                max(extents[i][2] for i in line_boxes),
+                max(extents[i][3] for i in line_boxes),
+            )
+            lines.append(TextLine(column, line_boxes, bounds))
+    return lines, skew
+
+
+def line_crops(image, lines, skew: float, pad: int = 5):
+    """
+    Returns one crop per line. Without noticeable skew the crop is an
+    axis-aligned view of image; otherwise the line's band is cut out along the
+    skew and straightened with one affine warp.
+    """
+    img_h, img_w = image.shape[:2]
+    crops = []
+    for line in lines:
+        x_min, y_min, x_max, y_max = line.bounds
+        if abs(skew) < MIN_DESKEW:
+            x0, y0 = max(0, int(round(x_min - pad))), max(0, int(round(y_min - pad)))
+            x1, y1 = min(img_w, int(round(x_max + pad))), min(img_h, int(round(y_max + pad)))
+            crops.append(image[y0:y1, x0:x1])
+            continue
+
+        x0, y0 = x_min - pad, y_min - pad
+        width, height = int(round(x_max - x_min + 2 * pad)), int(round(y_max - y_min + 2 * pad))
+        c, s = math.cos(skew), math.sin(skew)
+        # output pixel (u, v) -> deskewed (x0 + u, y0 + v) -> image coordinates
+        M = np.array([[c, -s, c * x0 - s * y0], [s, c, s * x0 + c * y0]], dtype=np.float64)
+        crops.append(cv2.warpAffine(
+            image, M, (width, height),
+            flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE
+        ))
+    return crops
@@ -0,0 +1,116 @@
+import torch
+
+DEFAULT_BATCH_SIZE = 8
+DEFAULT_MIN_CONFIDENCE = 0.85
+
+
+def group_by_width(line_images, batch_size: int):
+    """
+    Yields lists of indices into line_images, batch_size at a time, with crops
+    sorted by aspect ratio. TrOCR resizes every crop to the same input size, so
+    the padding that matters is on the decoder side: lines of similar width hold
+    a similar amount of text and finish beam search together, instead of one
+    long line keeping a batch of short ones decoding.
+    """
+    order = sorted(
+        range(len(line_images)),
+        key=lambda i: line_images[i].width / max(line_images[i].height, 1)
+    )
+    for start in range(0, len(order), batch_size):
+        yield order[start:start + batch_size]
+
+
+def recognize_lines(line_images, processor, model, batch_size: int = DEFAULT_BATCH_SIZE, device: str = 'cpu'):
+    """
+    Arguments:
+        line_images: list of PIL images, one per text line
+        processor: TrOCRProcessor
+        model: VisionEncoderDecoderModel, generation settings taken from model.config
+        batch_size: number of lines decoded per generate() call
+    Output:
+        list of recognized strings, in the order of line_images
+    """
+    texts = [""] * len(line_images)
+    batch_size = max(1, batch_size)
+
+    for batch in group_by_width(line_images, batch_size):
+        pixel_values = processor([line_images[i] for i in batch], return_tensors="pt").pixel_values.to(device)
+
+        with torch.no_grad():
+            generated_ids = model.generate(pixel_values)
+
+        for i, text in zip(batch, processor.batch_decode(generated_ids, skip_special_tokens=True)):
+            texts[i] = text
+
+    return texts
+
+
+def sequence_confidences(model, generated, pad_token_id, beam_search: bool = False):
+    """
+    Geometric mean token probability of each generated sequence, from the
+    scores generate() returns with output_scores=True. Padding after the end
+    of a sequence is ignored.
+    """
+    transition_scores = model.compute_transition_scores(
+        generated.sequences,
+        generated.scores,
+        generated.beam_indices if beam_search else None,
+        normalize_logits=not beam_search,
+    )
+    # sequences start with the decoder start token, which has no score
+    tokens = generated.sequences[:, -transition_scores.shape[1]:]
+    mask = (tokens != pad_token_id) & torch.isfinite(transition_scores)
+    log_probs = torch.where(mask, transition_scores, torch.zeros_like(transition_scores))
+    lengths = mask.sum(dim=1).clamp(min=1)
+    return torch.exp(log_probs.sum(dim=1) / lengths).tolist()
+
+
+def recognize_lines_adaptive(line_images, processor, model, batch_size: int = DEFAULT_BATCH_SIZE,
+                             device: str = 'cpu', min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+    """
+    Decodes every line greedily first and re-decodes only the lines whose
+    confidence is below min_confidence with the beam search configured in
+    model.config. Clean lines thus cost one greedy pass instead of num_beams.
+
+    Output:
+        (list of recognized strings, list of per-line confidences in [0, 1]),
+        both in the order of line_images
+    """
+    texts = [""] * len(line_images)
+    confidences = [0.0] * len(line_images)
+    batch_size = max(1, batch_size)
+    pad_token_id = model.config.pad_token_id
+
+    retry = []
+    for batch in group_by_width(line_images, batch_size):
+        pixel_values = processor([line_images[i] for i in batch], return_tensors="pt").pixel_values.to(device)
+
+        with torch.no_grad():
+            generated = model.generate(
+                pixel_values, num_beams=1, do_sample=False, early_stopping=False,
+                output_scores=True, return_dict_in_generate=True
+            )
+
+        decoded = processor.batch_decode(generated.sequences, skip_special_tokens=True)
+        scores = sequence_confidences(model, generated, pad_token_id)
+        for i, text, confidence in zip(batch, decoded, scores):
+            texts[i] = text
+            confidences[i] = confidence
+            if confidence < min_confidence:
+                retry.append(i)
+
+    if retry and getattr(model.config, "num_beams", 1) > 1:
+        for start in range(0, len(retry), batch_size):
+            batch = retry[start:start + batch_size]
+            pixel_values = processor([line_images[i] for i in batch], return_tensors="pt").pixel_values.to(device)
+
+            with torch.no_grad():
+                generated = model.generate(pixel_values, output_scores=True, return_dict_in_generate=True)
+
+            decoded = processor.batch_decode(generated.sequences, skip_special_tokens=True)
+            scores = sequence_confidences(model, generated, pad_token_id, beam_search=True)
+            for i, text, confidence in zip(batch, decoded, scores):
+                texts[i] = text
+                confidences[i] = confidence
+
+    return texts, confidences
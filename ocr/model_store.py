@@ -0,0 +1,74 @@
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_STORE_DIR = os.environ.get("OCR_MODEL_STORE", os.path.join(PROJECT_ROOT, '.cache', 'models'))
+
+
+def local_model_dir(model_id: str) -> str:
+    return os.path.join(MODEL_STORE_DIR, model_id.replace('/', '--'))
+
+
+def load_trocr_processor(model_id: str):
+    """
+    Returns the TrOCRProcessor from the local model store, or from the hub if
+    the model has not been stored yet.
+    """
+    from transformers import TrOCRProcessor
+
+    local_dir = local_model_dir(model_id)
+    if os.path.isfile(os.path.join(local_dir, 'model.safetensors')):
+        return TrOCRProcessor.from_pretrained(local_dir, local_files_only=True)
+    return TrOCRProcessor.from_pretrained(model_id)
+
+
+def load_trocr(model_id: str):
+    """
+    Returns (TrOCRProcessor, VisionEncoderDecoderModel) from the local model
+    store. The first call downloads the model and saves it there as
+    safetensors; later calls load it without hub lookups, and safetensors
+    memory-maps the weights instead of reading and unpickling them.
+    """
+    from transformers import TrOCRProcessor, VisionEncoderDecoderModel
+
+    local_dir = local_model_dir(model_id)
+    if os.path.isfile(os.path.join(local_dir, 'model.safetensors')):
+        processor = load_trocr_processor(model_id)
+        model = VisionEncoderDecoderModel.from_pretrained(local_dir, local_files_only=True, low_cpu_mem_usage=True)
+        return processor, model
+
+    processor = TrOCRProcessor.from_pretrained(model_id)
+    model = VisionEncoderDecoderModel.from_pretrained(model_id)
+
+    tmp_dir = local_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    processor.save_pretrained(tmp_dir)
+    model.save_pretrained(tmp_dir, safe_serialization=True)
+    shutil.rmtree(local_dir, ignore_errors=True)
+    os.replace(tmp_dir, local_dir)
+    print(f"Saved {model_id} to the local model store at {local_dir}", file=sys.stderr)
+    return processor, model
+
+
+class StartupTimer:
+    """
+    Collects how long each model takes to load and prints one report line.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = time.time()
+        self.steps = []
+
+    @contextmanager
+    def step(self, label: str):
+        start = time.time()
+        yield
+        self.steps.append((label, time.time() - start))
+
+    def report(self):
+        steps = ", ".join(f"{label} {seconds:.1f}s" for label, seconds in self.steps)
+        print(f"{self.name} ready in {time.time() - self.start:.1f}s ({steps})", file=sys.stderr)
@@ -0,0 +1,51 @@
+# Settings of the OCR stage: CRAFT detection, TrOCR recognition and routing.
+import os
+
+TROCR_MODEL_ID = 'microsoft/trocr-base-handwritten'
+
+# Engine of the OCR stage for image pages: "trocr" (CRAFT + TrOCR),
+# "tesseract", or "auto", which sends pages page_classifier scores as printed
+# to Tesseract and everything else to TrOCR. main.py --ocr-engine overrides it.
+OCR_ENGINES = ("auto", "trocr", "tesseract")
+OCR_ENGINE = os.environ.get("OCR_ENGINE", "auto")
+
+# Picked on OCR_test_documents, where printed pages score >= 0.32 and the
+# handwritten and whiteboard ones <= 0.25. benchmark_ocr_router.py reports on
+# the same pages, so its routing accuracy there is optimistic; check new page
+# types before relying on it.
+PRINTED_THRESHOLD = 0.29
+
+CRAFT_CONFIG = {
+    "text_threshold": 0.8,
+    "link_threshold": 0.4,
+    "low_text": 0.4,
+    # set e.g. 1280 to detect images larger than long_size (1280) at native
+    # resolution in overlapping tiles instead of downscaling them; helps small
+    # handwriting on high-resolution photos
+    "tile_size": None,
+    "tile_overlap": 256,
+    "tile_batch_size": 2,
+    # "onnx" runs CraftNet/RefineNet with ONNX Runtime; export the graphs
+    # once with: python ocr/export_craft_onnx.py
+    "backend": "torch",
+}
+
+# Opt-in int8 inference for CPU-only servers (OCR_QUANTIZE=1): dynamically
+# quantized Linear layers in the TrOCR decoder and statically quantized
+# CraftNet convolutions, calibrated on the pages in OCR_calibration_documents
+# (or OCR_CALIBRATION_DIR). Check accuracy with
+# Evaluation/Performance/quantization_accuracy_gate.py before enabling it.
+QUANTIZE = os.environ.get("OCR_QUANTIZE", "0") == "1"
+
+# Lines are decoded greedily first; only lines whose mean token probability is
+# below this are decoded again with the beam search below. None always uses
+# beam search.
+TROCR_MIN_CONFIDENCE = 0.85
+
+TROCR_GENERATION_CONFIG = {
+    "num_beams": 5,
+    "early_stopping": True,
+    "max_length": 80,
+    "no_repeat_ngram_size": 3,
+    "length_penalty": 2.0,
+}
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+
+from ocr_config import PRINTED_THRESHOLD
+
+PRINTED = "printed"
+HANDWRITTEN = "handwritten"
+MAX_SIDE = 1600
+MIN_COMPONENTS = 30
+
+
+def printed_score(image) -> float:
+    """
+    Scores how printed a page looks from its ink components: printed glyphs
+    fill more of their bounding box and have more uniform heights than pen
+    strokes. Takes an RGB or grayscale page; runs in a few milliseconds.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY) if image.ndim == 3 else image
+    scale = MAX_SIDE / max(gray.shape)
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    ink = cv2.adaptiveThreshold(
+        cv2.medianBlur(gray, 3), 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 31, 15
+    )
+    _, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+    width, height, area = stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_HEIGHT], stats[1:, cv2.CC_STAT_AREA]
+
+    # drop specks, rules and pictures, then punctuation
+    keep = (height >= 6) & (height < gray.shape[0] / 8) & (area >= 15)
+    if keep.sum() < MIN_COMPONENTS:
+        return 0.0
+    width, height, area = width[keep], height[keep], area[keep]
+    keep = height > 0.5 * np.median(height)
+    width, height, area = width[keep], height[keep], area[keep]
+
+    fill = float(np.median(area / (width * height)))
+    height_variation = float(np.std(height) / np.mean(height))
+    return fill - 0.5 * height_variation
+
+
+def classify_page(image, threshold: float = PRINTED_THRESHOLD):
+    """
+    Returns (PRINTED or HANDWRITTEN, score). Pages with too little text to
+    judge count as handwritten, which the slower TrOCR path handles either way.
+    """
+    score = printed_score(image)
+    return (PRINTED if score >= threshold else HANDWRITTEN), score
@@ -1,39 +1,165 @@
 import os
+import tempfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import pypdfium2 as pdfium
 from PyPDF2 import PdfReader
 
+DEFAULT_OCR_WORKERS = 2
+# resolution scanned pages are rendered at for OCR
+RENDER_DPI = 300
+# pages are joined with a form feed line, which lecture generation uses to
+# split long documents at page boundaries
+PAGE_SEPARATOR = "\n\f\n"
+
+def iter_page_texts(reader):
+    """
+    Yields (page_number, page, text) one page at a time; text is "" for pages
+    without a text layer. Pages are only parsed when the caller gets to them.
+    """
+    for page_number, page in enumerate(reader.pages, start=1):
+        page_text = page.extract_text()
+        yield page_number, page, page_text.strip() if page_text else ""
+
 def is_text_pdf(pdf_path):
-    reader = PdfReader(pdf_path)
-    return any(page.extract_text() for page in reader.pages)
+    return any(text for _, _, text in iter_page_texts(PdfReader(pdf_path)))
 
 def extract_text_from_pdf(pdf_path):
-    reader = PdfReader(pdf_path)
-    all_text = ""
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            all_text += page_text + "\n"
-    return all_text.strip()
+    return PAGE_SEPARATOR.join(text for _, _, text in iter_page_texts(PdfReader(pdf_path)) if text)
+
+def render_page(document, page_number, output_dir, dpi=RENDER_DPI):
+    """
+    Renders a whole page of a pypdfium2 document to a PNG in output_dir and
+    returns its path. The page is drawn as a viewer shows it: /Rotate and image
+    placement are applied, scans split into strips come out as one image, and
+    vector-only pages (e.g. text converted to outlines) are included.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    page = document[page_number - 1]
+    try:
+        image = page.render(scale=dpi / 72).to_pil()
+    finally:
+        page.close()
+    image_path = os.path.join(output_dir, f"page_{page_number:04d}.png")
+    image.save(image_path)
+    return image_path
+
+def ocr_page(image_path, ocr_image):
+    """
+    OCRs one rendered page and deletes its image.
+    """
+    try:
+        return ocr_image(image_path).strip()
+    finally:
+        os.remove(image_path)
+
+
+class _PageWriter:
+    """
+    Appends page texts to the output file in page order as soon as every
+    earlier page is done, so text pages are written while OCR is still running
+    on scanned ones. Entries are strings or Futures of strings.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.pending = deque()
+        self.texts = []
+        self.file = None
 
-def analyze_and_save(pdf_path):
+    def add(self, entry):
+        self.pending.append(entry)
+        self.flush()
+
+    def flush(self, wait=False):
+        while self.pending:
+            entry = self.pending[0]
+            if isinstance(entry, Future):
+                if not (wait or entry.done()):
+                    break
+                entry = entry.result()
+            self.pending.popleft()
+            if entry:
+                self._write(entry)
+
+    def _write(self, text):
+        if self.file is None:
+            self.file = open(self.output_path, "w", encoding="utf-8")
+        else:
+            self.file.write(PAGE_SEPARATOR)
+        self.file.write(text)
+        self.texts.append(text)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+def analyze_and_save(pdf_path, ocr_image=None, max_workers=DEFAULT_OCR_WORKERS):
+    """
+    Extracts the text of every page in a single pass, using the text layer
+    where a page has one. Pages without a text layer are rendered at RENDER_DPI
+    and passed to ocr_image(image_path) -> text, up to
+    max_workers pages at a time; the next page is only rendered once a worker
+    is about to be free, and each rendered page is deleted after its OCR. The
+    first failed page cancels the pages not yet started and is re-raised.
+    Page texts are written to the output file incrementally and in page
+    order. Without ocr_image, scanned pages are skipped.
+    """
     root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
     output_folder = os.path.join(root_dir, "OCR_outputs/printed_text_output")
     os.makedirs(output_folder, exist_ok=True)
 
     pdf_filename = os.path.basename(pdf_path)
-    output_filename = os.path.splitext(pdf_filename)[0] + ".txt"
+    pdf_name = os.path.splitext(pdf_filename)[0]
+    output_filename = pdf_name + ".txt"
     output_path = os.path.join(output_folder, output_filename)
+    max_workers = max(1, max_workers)
+
+    writer = _PageWriter(output_path)
+    scanned_pages = 0
+    # pages are rendered on this thread only; pdfium is not thread-safe
+    document = pdfium.PdfDocument(pdf_path) if ocr_image is not None else None
 
-    extracted_text = ""
+    try:
+        with tempfile.TemporaryDirectory(prefix=f"{pdf_name}_pages_") as pages_dir, \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+            try:
+                for page_number, page, page_text in iter_page_texts(PdfReader(pdf_path)):
+                    if page_text:
+                        writer.add(page_text)
+                        continue
 
-    if is_text_pdf(pdf_path):
-        extracted_text = extract_text_from_pdf(pdf_path)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(extracted_text)
+                    scanned_pages += 1
+                    if ocr_image is None:
+                        continue
+                    while len(in_flight) >= max_workers:
+                        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            future.result()  # re-raises the page's error
+                        writer.flush()
+                    future = executor.submit(ocr_page, render_page(document, page_number, pages_dir), ocr_image)
+                    in_flight.add(future)
+                    writer.add(future)
+
+                writer.flush(wait=True)
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        writer.close()
+        if document is not None:
+            document.close()
+
+    if scanned_pages and ocr_image is None:
+        print(f"⚠️ {scanned_pages} page(s) of this PDF do not contain extractable text. Use OCR instead.")
+    elif scanned_pages:
+        print(f"✅ OCR applied to {scanned_pages} scanned page(s).")
+
+    if writer.texts:
         print(f"✅ Text extracted and saved to: {output_path}")
-    else:
-        print("⚠️ This PDF does not contain extractable text. Use OCR instead.")
-    
-    return extracted_text
+
+    return PAGE_SEPARATOR.join(writer.texts)
 
 
 if __name__ == "__main__":  
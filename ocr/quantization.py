@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import sys
+
+import cv2
+import torch
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUANTIZED_CACHE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'quantized')
+# Raw RGB pages of different kinds (slides, diagrams, a photo) rendered from
+# documents the accuracy gate does not evaluate; SOURCES.txt there lists
+# where each page comes from, and the gate leaves those documents out.
+CALIBRATION_DIR = os.environ.get(
+    "OCR_CALIBRATION_DIR", os.path.join(PROJECT_ROOT, 'OCR_calibration_documents')
+)
+CALIBRATION_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+def _library_versions() -> dict:
+    versions = {"torch": torch.__version__}
+    try:
+        import transformers
+        versions["transformers"] = transformers.__version__
+    except ImportError:
+        pass
+    return versions
+
+
+def _file_stamp(path) -> list:
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def cached_quantized(name: str, settings: dict, build, rebuild, sources=()):
+    """
+    Returns a quantized model whose weights are cached in QUANTIZED_CACHE_DIR.
+    On a miss build() quantizes the model and its state_dict is saved; on a
+    hit rebuild() recreates the quantized module without calibrating it and
+    the saved tensors are loaded into it, so nothing but tensors is unpickled.
+    The file name covers name, settings, the torch and transformers versions
+    and the path, size and modification time of each file in sources (the
+    float weights the model was quantized from).
+    """
+    key = json.dumps(
+        [name, settings, _library_versions(), [_file_stamp(source) for source in sources]], sort_keys=True
+    )
+    path = os.path.join(QUANTIZED_CACHE_DIR, f"{name}_{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}.pt")
+
+    if os.path.isfile(path):
+        model = rebuild()
+        model.load_state_dict(torch.load(path, map_location='cpu', weights_only=True))
+        return model.eval()
+
+    model = build()
+    os.makedirs(QUANTIZED_CACHE_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    torch.save(model.state_dict(), tmp_path)
+    os.replace(tmp_path, path)
+    print(f"Quantized {name} saved to {path}", file=sys.stderr)
+    return model
+
+
+def quantize_trocr_decoder(model):
+    """
+    Replaces the Linear layers of the TrOCR decoder (the part beam search runs
+    once per token) with dynamically quantized int8 ones. The ViT encoder runs
+    once per line and stays in float32.
+    """
+    model.decoder = torch.ao.quantization.quantize_dynamic(
+        model.decoder, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return model.eval()
+
+
+def calibration_images(image_dir: str = CALIBRATION_DIR):
+    names = sorted(name for name in os.listdir(image_dir) if name.lower().endswith(CALIBRATION_EXTENSIONS))
+    if not names:
+        raise FileNotFoundError(f"No calibration images found in {image_dir}.")
+    return [os.path.join(image_dir, name) for name in names]
+
+
+def calibration_inputs(long_size: int, image_dir: str = CALIBRATION_DIR):
+    """
+    Yields preprocessed CRAFT inputs of the calibration pages, used to pick
+    the int8 activation ranges of CraftNet.
+    """
+    from craft_text_detector import image_utils
+
+    for path in calibration_images(image_dir):
+        image = image_utils.read_image(path)
+        img_resized, _, _ = image_utils.resize_aspect_ratio(image, long_size, interpolation=cv2.INTER_LINEAR)
+        x = image_utils.normalizeMeanVariance(img_resized)
+        yield torch.from_numpy(x).permute(2, 0, 1).unsqueeze(0)
+
+
+def _prepare_craftnet(craft_net, example):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx
+
+    return prepare_fx(craft_net.eval(), get_default_qconfig_mapping("x86"), example_inputs=(example,))
+
+
+def quantize_craftnet(craft_net, long_size: int = 1280, image_dir: str = CALIBRATION_DIR):
+    """
+    Statically quantizes CraftNet's convolutions to int8 with FX graph mode,
+    calibrated on the pages in image_dir. Outputs are dequantized, so the
+    result is a drop-in replacement for get_prediction.
+    """
+    from torch.ao.quantization.quantize_fx import convert_fx
+
+    inputs = calibration_inputs(long_size, image_dir)
+    first = next(inputs)
+    prepared = _prepare_craftnet(craft_net, first)
+    with torch.no_grad():
+        prepared(first)
+        for x in inputs:
+            prepared(x)
+    return convert_fx(prepared).eval()
+
+
+def craftnet_int8_module(craft_net):
+    """
+    The module structure quantize_craftnet produces, with placeholder
+    activation ranges; cached_quantized loads the calibrated state into it.
+    """
+    from torch.ao.quantization.quantize_fx import convert_fx
+
+    example = torch.zeros(1, 3, 64, 64)
+    prepared = _prepare_craftnet(craft_net, example)
+    with torch.no_grad():
+        prepared(example)
+    return convert_fx(prepared).eval()
@@ -1,110 +1,127 @@
+import json
+import time
 import cv2
 from PIL import Image
-from transformers import TrOCRProcessor, VisionEncoderDecoderModel
-import torch
 import sys
 import os
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from craft_text_detector import Craft
+import layout
+from page_classifier import PRINTED, classify_page
+from model_store import StartupTimer, load_trocr
+from line_recognition import DEFAULT_BATCH_SIZE, recognize_lines, recognize_lines_adaptive
+from ocr_config import CRAFT_CONFIG, OCR_ENGINE, OCR_ENGINES, QUANTIZE, TROCR_GENERATION_CONFIG, TROCR_MIN_CONFIDENCE, TROCR_MODEL_ID
+
+OCR_BATCH_SIZE = int(os.environ.get("TROCR_BATCH_SIZE", DEFAULT_BATCH_SIZE))
+CRAFT_BATCH_SIZE = int(os.environ.get("CRAFT_BATCH_SIZE", 4))
+
+startup = StartupTimer("OCR stage")
+
+with startup.step("CRAFT"):
+    craft = Craft(
+        output_dir=None,
+        cuda=False,
+        **CRAFT_CONFIG
+    )
+
+with startup.step("TrOCR"):
+    if QUANTIZE:
+        from craft_text_detector.craft_utils import craftnet_weight_path
+        from quantization import (
+            cached_quantized, calibration_images, craftnet_int8_module, quantize_craftnet, quantize_trocr_decoder
+        )
+
+        # dynamic quantization takes a moment and needs the float weights
+        # loaded anyway, so the decoder is quantized on every start
+        processor, model = load_trocr(TROCR_MODEL_ID)
+        model = quantize_trocr_decoder(model.to('cpu'))
+        if craft.backend == "torch":
+            float_craft_net = craft.craft_net
+            craft.craft_net = cached_quantized(
+                "craftnet_int8", {"long_size": craft.long_size},
+                lambda: quantize_craftnet(float_craft_net, craft.long_size),
+                lambda: craftnet_int8_module(float_craft_net),
+                sources=[craftnet_weight_path(CRAFT_CONFIG.get("weight_path_craft_net")), *calibration_images()]
+            )
+    else:
+        processor, model = load_trocr(TROCR_MODEL_ID)
+        model = model.to('cpu')
+
+startup.report()
 
-craft = Craft(
-    output_dir=None,
-    text_threshold=0.8,
-    link_threshold=0.4,
-    low_text=0.4,
-    cuda=False
-)
-
-processor = TrOCRProcessor.from_pretrained('microsoft/trocr-base-handwritten')
-model = VisionEncoderDecoderModel.from_pretrained('microsoft/trocr-base-handwritten').to('cpu')
-
-model.config.num_beams = 5
-model.config.early_stopping = True
-model.config.max_length = 80
-model.config.no_repeat_ngram_size = 3
-model.config.length_penalty = 2.0
+for name, value in TROCR_GENERATION_CONFIG.items():
+    setattr(model.config, name, value)
 model.config.decoder_start_token_id = processor.tokenizer.cls_token_id
 model.config.eos_token_id = processor.tokenizer.sep_token_id
 model.config.pad_token_id = processor.tokenizer.pad_token_id
 
-def run_ocr(image_path: str, output_dir: str = "step_outputs/OCR_outputs") -> str:
-    image = cv2.imread(image_path)
-    if image is None:
-        print(f"Error: Could not read image from {image_path}. Please check the path and file integrity.", file=sys.stderr)
-        sys.exit(1)
-
-    result = craft.detect_text(image_path)
-    boxes = result["boxes"]
-
-    rects = []
-    for poly in boxes:
-        xs = [p[0] for p in poly]
-        ys = [p[1] for p in poly]
-        x_min, x_max = min(xs), max(xs)
-        y_min, y_max = min(ys), max(ys)
-        
-        if (x_max - x_min) < 10 or (y_max - y_min) < 10:
-            continue
-        rects.append((x_min, y_min, x_max, y_max))
-
-    rects.sort(key=lambda r: r[1])
-    
-    lines = []
-    current_line = []
-    current_y_center = None
-    line_height = None
-
-    for rect in rects:
-        x_min, y_min, x_max, y_max = rect
-        h = y_max - y_min
-        center_y = y_min + h / 2
-        
-        if not current_line:
-            current_line = [rect]
-            current_y_center = center_y
-            line_height = h
-        else:
-            if center_y < current_y_center + 0.5 * line_height:
-                current_line.append(rect)
-            else:
-                lines.append(current_line)
-                current_line = [rect]
-                current_y_center = center_y
-                line_height = h
-    if current_line:
-        lines.append(current_line)
-
-    for line in lines:
-        line.sort(key=lambda r: r[0])
-
-    recognized_lines = []
-    pil_image = Image.fromarray(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+def _line_images(image, boxes):
+    """
+    Groups detected word boxes into text lines and returns one PIL crop per
+    line in reading order. image is the RGB page; unskewed crops are cut from
+    views of it.
+    """
+    lines, skew = layout.group_lines(boxes)
+    return [Image.fromarray(crop) for crop in layout.line_crops(image, lines, skew)]
+
+
+def _recognize(line_images, batch_size: int):
+    """
+    Returns (texts, confidences) of the line crops; confidences are None when
+    every line goes through beam search.
+    """
+    if TROCR_MIN_CONFIDENCE is None:
+        return recognize_lines(line_images, processor, model, batch_size=batch_size), None
+    return recognize_lines_adaptive(line_images, processor, model, batch_size=batch_size,
+                                    min_confidence=TROCR_MIN_CONFIDENCE)
+
+
+_tesseract = None
+
+
+def _load_tesseract():
+    """
+    Returns the Tesseract module, or None when pytesseract or the tesseract
+    binary is missing from this environment.
+    """
+    global _tesseract
+    if _tesseract is None:
+        try:
+            import Tesseract
+            Tesseract.pytesseract.get_tesseract_version()
+            _tesseract = Tesseract
+        except Exception as e:
+            print(f"Tesseract is not available ({e}); pages go to TrOCR.", file=sys.stderr)
+            _tesseract = False
+    return _tesseract or None
 
-    for line in lines:
-        x_min = min([r[0] for r in line])
-        y_min = min([r[1] for r in line])
-        x_max = max([r[2] for r in line])
-        y_max = max([r[3] for r in line])
 
-        pad = 5
-        x_min = max(0, x_min - pad)
-        y_min = max(0, y_min - pad)
-        x_max = min(image.shape[1], x_max + pad)
-        y_max = min(image.shape[0], y_max + pad)
+def _route(image, image_path: str, engine: str) -> str:
+    """
+    Returns the engine that reads the page: engine itself, or with "auto"
+    Tesseract for pages the classifier scores as printed and TrOCR otherwise.
+    """
+    if engine not in OCR_ENGINES:
+        raise ValueError(f"Unknown OCR engine: {engine}. Choose one of {', '.join(OCR_ENGINES)}.")
+    if engine == "tesseract" and _load_tesseract() is None:
+        raise RuntimeError("The tesseract engine needs pytesseract and the tesseract binary.")
+    if engine != "auto":
+        return engine
 
-        line_img = pil_image.crop((x_min, y_min, x_max, y_max))
+    label, score = classify_page(image)
+    routed = "tesseract" if label == PRINTED and _load_tesseract() is not None else "trocr"
+    print(f"{os.path.basename(image_path)}: {label} (score {score:.2f}), using {routed}", file=sys.stderr)
+    return routed
 
-        pixel_values = processor(line_img, return_tensors="pt").pixel_values.to('cpu')
 
-        with torch.no_grad():
-            generated_ids = model.generate(pixel_values)
-        
-        text = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-        recognized_lines.append(text)
+def _tesseract_text(image) -> str:
+    tesseract = _load_tesseract()
+    thresh = tesseract.preprocess(image, cv2.COLOR_RGB2GRAY)
+    return tesseract.pytesseract.image_to_string(thresh, lang='eng', config='--oem 3 --psm 6').strip()
 
-    final_text = "\n".join(recognized_lines)
 
+def _save_text(image_path: str, output_dir: str, final_text: str, confidences=None) -> None:
     image_filename = os.path.basename(image_path)
     image_name, _ = os.path.splitext(image_filename)
     output_filename = f"{image_name}.txt"
@@ -112,20 +129,124 @@ def run_ocr(image_path: str, output_dir: str = "step_outputs/OCR_outputs") -> st
     os.makedirs(output_dir, exist_ok=True)
     with open(os.path.join(output_dir, output_filename), "w", encoding="utf-8") as f:
         f.write(final_text)
+    if confidences is not None:
+        # per-line confidences next to the text, one entry per output line
+        with open(os.path.join(output_dir, f"{image_name}.confidences.json"), "w", encoding="utf-8") as f:
+            json.dump([{"text": line, "confidence": round(confidence, 4)}
+                       for line, confidence in zip(final_text.split("\n"), confidences)], f, indent=2)
 
     print(f"OCR done for: {image_filename}. Text saved to {os.path.join(output_dir, output_filename)}", file=sys.stderr)
-    
+
+
+def _read_image(image_path: str):
+    """
+    Decodes the image once and converts it to RGB in place; the same buffer
+    feeds CRAFT and the line crops.
+    """
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"Error: Could not read image from {image_path}. Please check the path and file integrity.", file=sys.stderr)
+        sys.exit(1)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+
+def run_ocr(image_path: str, output_dir: str = "step_outputs/OCR_outputs", batch_size: int = OCR_BATCH_SIZE,
+            return_confidences: bool = False, engine: str = OCR_ENGINE):
+    """
+    Returns the recognized text, or (text, per-line confidences) with
+    return_confidences; confidences are None for pages read by Tesseract.
+    """
+    image = _read_image(image_path)
+    start = time.time()
+
+    if _route(image, image_path, engine) == "tesseract":
+        final_text, confidences, page_engine = _tesseract_text(image), None, "tesseract"
+    else:
+        result = craft.detect_text(image)
+        line_images = _line_images(image, result["boxes"])
+
+        recognized_lines, confidences = _recognize(line_images, batch_size)
+        final_text, page_engine = "\n".join(recognized_lines), "trocr"
+    _save_text(image_path, output_dir, final_text, confidences)
+    print(f"{os.path.basename(image_path)}: {page_engine} took {time.time() - start:.2f}s", file=sys.stderr)
+
+    if return_confidences:
+        return final_text, confidences
     return final_text
 
+
+def run_ocr_batch(image_paths, output_dir: str = "step_outputs/OCR_outputs", batch_size: int = OCR_BATCH_SIZE,
+                  craft_batch_size: int = CRAFT_BATCH_SIZE, engine: str = OCR_ENGINE):
+    """
+    OCRs many pages at once: CRAFT detects pages of similar shape in one
+    forward pass and TrOCR recognizes the lines of all pages in shared
+    batches. Pages routed to Tesseract are read one by one. Returns one text
+    per image path.
+    """
+    images = [_read_image(image_path) for image_path in image_paths]
+    engines = [_route(image, image_path, engine) for image, image_path in zip(images, image_paths)]
+    texts = [None] * len(images)
+
+    for i, page_engine in enumerate(engines):
+        if page_engine == "tesseract":
+            page_start_time = time.time()
+            texts[i] = _tesseract_text(images[i])
+            _save_text(image_paths[i], output_dir, texts[i])
+            print(f"{os.path.basename(image_paths[i])}: tesseract took {time.time() - page_start_time:.2f}s", file=sys.stderr)
+
+    trocr_pages = [i for i, page_engine in enumerate(engines) if page_engine == "trocr"]
+    if not trocr_pages:
+        return texts
+
+    start_time = time.time()
+    results, pages_per_second = craft.detect_text_batch(
+        [images[i] for i in trocr_pages],
+        batch_size=craft_batch_size
+    )
+    print(f"CRAFT detected {len(trocr_pages)} pages at {pages_per_second:.2f} pages/s", file=sys.stderr)
+
+    page_lines = [_line_images(images[i], result["boxes"]) for i, result in zip(trocr_pages, results)]
+    recognized_lines, confidences = _recognize([line for lines in page_lines for line in lines], batch_size)
+
+    first_line = 0
+    for i, lines in zip(trocr_pages, page_lines):
+        end = first_line + len(lines)
+        texts[i] = "\n".join(recognized_lines[first_line:end])
+        _save_text(image_paths[i], output_dir, texts[i], confidences[first_line:end] if confidences is not None else None)
+        first_line = end
+    print(f"trocr took {time.time() - start_time:.2f}s for {len(trocr_pages)} pages", file=sys.stderr)
+    return texts
+
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        image_path = sys.argv[1]
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from pipeline.worker import serve
+
+        def handle(image_path=None, image_paths=None, engine=OCR_ENGINE, quantize=QUANTIZE):
+            # the models were loaded at start-up; the caller keys its cache on
+            # its own OCR_QUANTIZE, so refuse results it would mislabel
+            if quantize != QUANTIZE:
+                raise ValueError(f"This OCR worker was started with OCR_QUANTIZE={int(QUANTIZE)}, but the caller "
+                                 f"expects OCR_QUANTIZE={int(quantize)}; restart the pipeline daemon with the same setting.")
+            if image_paths is not None:
+                return run_ocr_batch(image_paths, engine=engine)
+            return run_ocr(image_path, engine=engine)
+
+        serve(handle)
+    elif len(sys.argv) > 1:
+        image_paths = sys.argv[1:]
+        engine = OCR_ENGINE
+        if image_paths[0] == "--engine" and len(image_paths) > 2:
+            engine, image_paths = image_paths[1], image_paths[2:]
         try:
-            extracted_text = run_ocr(image_path)
+            if len(image_paths) == 1:
+                extracted_text = run_ocr(image_paths[0], engine=engine)
+            else:
+                extracted_text = "\n\n".join(run_ocr_batch(image_paths, engine=engine))
             print(extracted_text)
         except Exception as e:
             print(f"Error during OCR execution in trocr_script: {e}", file=sys.stderr)
             sys.exit(1)
     else:
-        print("Usage: python trocr_script.py <path_to_image>", file=sys.stderr)
+        print("Usage: python trocr_script.py [--engine auto|trocr|tesseract] <path_to_image> [<path_to_image> ...]", file=sys.stderr)
         sys.exit(1)
@@ -1,22 +1,79 @@
+import argparse
 import os
+import sys
 import cv2
 import numpy as np
 from PIL import Image
-from transformers import TrOCRProcessor, VisionEncoderDecoderModel
 
-processor = TrOCRProcessor.from_pretrained("microsoft/trocr-base-handwritten")
-model = VisionEncoderDecoderModel.from_pretrained("microsoft/trocr-base-handwritten")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from line_recognition import DEFAULT_BATCH_SIZE, recognize_lines
+from model_store import StartupTimer, load_trocr
+
+TROCR_MODEL_ID = "microsoft/trocr-base-handwritten"
+OCR_BATCH_SIZE = int(os.environ.get("TROCR_BATCH_SIZE", DEFAULT_BATCH_SIZE))
 
 INPUT_IMAGE_PATH = "OCR_test_documents/handwritten4.png"
 TEMP_LINE_DIR = "lines_temp"
 
-def extract_lines_projection(image_path):
-    filename = os.path.splitext(os.path.basename(image_path))[0]
-    output_dir = os.path.join(TEMP_LINE_DIR, filename)
-    os.makedirs(output_dir, exist_ok=True)
-
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+_trocr = None
+
+
+def load_model():
+    """
+    Loads TrOCR on first use, so the segmenters can be imported without it.
+    """
+    global _trocr
+    if _trocr is None:
+        startup = StartupTimer("TrOCR (OpenCV lines)")
+        with startup.step("TrOCR"):
+            _trocr = load_trocr(TROCR_MODEL_ID)
+        startup.report()
+    return _trocr
+
+
+def _read_image(image):
+    """
+    Accepts a path or an already decoded BGR array and returns the RGB page,
+    converted in place when it was read here.
+    """
+    if isinstance(image, np.ndarray):
+        return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    img = cv2.imread(image)
+    if img is None:
+        raise FileNotFoundError(f"Could not read image: {image}")
+    return cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+
+
+def _save_debug_lines(crops, debug_dir):
+    os.makedirs(debug_dir, exist_ok=True)
+    for idx, crop in enumerate(crops):
+        cv2.imwrite(os.path.join(debug_dir, f"line_{idx}.png"), cv2.cvtColor(crop, cv2.COLOR_RGB2BGR))
+
+
+def runs(mask, min_length: int = 0):
+    """
+    Returns the (start, end) pairs of the runs of True in a 1-D mask, end
+    exclusive, keeping runs longer than min_length.
+    """
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    keep = (ends - starts) > min_length
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def extract_lines_projection(image, debug_dir=None, pad: int = 5, min_height: int = 10):
+    """
+    Splits the page into full-width lines at the valleys of its horizontal
+    projection profile.
+
+    Arguments:
+        image: image path or BGR array
+        debug_dir: if set, every crop is also written there as line_<n>.png
+    Output:
+        list of RGB line crops, top to bottom, as views of the page
+    """
+    img = _read_image(image)
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
 
     blur = cv2.GaussianBlur(gray, (5, 5), 0)
     _, binary = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
@@ -24,91 +81,87 @@ def extract_lines_projection(image_path):
     kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 5))
     morph = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
 
-    h_proj = np.sum(morph, axis=1)
-    threshold = np.max(h_proj) * 0.2
-
-    lines = []
-    inside_line = False
-    start = 0
-    for i, val in enumerate(h_proj):
-        if val > threshold and not inside_line:
-            inside_line = True
-            start = i
-        elif val <= threshold and inside_line:
-            inside_line = False
-            end = i
-            if (end - start) > 10:
-                lines.append((start, end))
-
-    line_images = []
-    for idx, (y1, y2) in enumerate(lines):
-        pad = 5
+    h_proj = morph.sum(axis=1, dtype=np.int64)
+    threshold = h_proj.max() * 0.2
+
+    crops = []
+    for y1, y2 in runs(h_proj > threshold, min_height):
         y1 = max(0, y1 - pad)
         y2 = min(img.shape[0], y2 + pad)
-        line_img = img[y1:y2, :]
-        line_path = os.path.join(output_dir, f"line_{idx}.png")
-        cv2.imwrite(line_path, line_img)
-        line_images.append(line_path)
+        crops.append(img[y1:y2, :])
 
-    return line_images
+    if debug_dir:
+        _save_debug_lines(crops, debug_dir)
+    return crops
 
 
-def extract_lines_from_image(image_path):
-    img = cv2.imread(image_path)
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+def extract_lines_from_image(image, debug_dir=None, pad: int = 10):
+    """
+    Finds lines as contours of the page closed with a wide horizontal kernel.
+    Takes and returns the same as extract_lines_projection.
+    """
+    img = _read_image(image)
+    gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
 
     _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
     kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
     morphed = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
 
     contours, _ = cv2.findContours(morphed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    contours = sorted(contours, key=lambda ctr: cv2.boundingRect(ctr)[1])
+    rects = sorted((cv2.boundingRect(cnt) for cnt in contours), key=lambda r: r[1])
 
-    lines = []
-    for idx, cnt in enumerate(contours):
-        x, y, w, h = cv2.boundingRect(cnt)
+    crops = []
+    for x, y, w, h in rects:
         #if h > 50
         #if h > 40
         if h > 30 and w > 100:
-            pad = 10
             x_start = max(x - pad, 0)
             y_start = max(y - pad, 0)
             x_end = min(x + w + pad, img.shape[1])
             y_end = min(y + h + pad, img.shape[0])
-            line_img = img[y_start:y_end, x_start:x_end]
-            line_path = os.path.join(TEMP_LINE_DIR, f"line_{idx}.png")
-            cv2.imwrite(line_path, line_img)
-            lines.append(line_path)
-    return lines
-
-def run_tr_ocr_on_line(image_path):
-    image = Image.open(image_path).convert("RGB")
-    pixel_values = processor(images=image, return_tensors="pt").pixel_values
-    generated_ids = model.generate(pixel_values)
-    text = processor.batch_decode(generated_ids, skip_special_tokens=True)[0]
-    return text.strip()
+            crops.append(img[y_start:y_end, x_start:x_end])
+
+    if debug_dir:
+        _save_debug_lines(crops, debug_dir)
+    return crops
+
+
+def run_ocr(image, batch_size: int = OCR_BATCH_SIZE, debug_dir=None):
+    """
+    Segments the page with the projection profile and decodes the in-memory
+    line crops with batched TrOCR. Returns the recognized lines.
+    """
+    crops = extract_lines_projection(image, debug_dir=debug_dir)
+    if not crops:
+        return []
+    processor, model = load_model()
+    texts = recognize_lines([Image.fromarray(crop) for crop in crops], processor, model, batch_size=batch_size)
+    return [text.strip() for text in texts]
+
 
 def main():
-    print("Extracting lines from original image...")
-    line_images = extract_lines_projection(INPUT_IMAGE_PATH)
+    parser = argparse.ArgumentParser(description="TrOCR on lines segmented with OpenCV.")
+    parser.add_argument("image_path", nargs="?", default=INPUT_IMAGE_PATH)
+    parser.add_argument("--batch-size", type=int, default=OCR_BATCH_SIZE,
+                        help="Number of lines decoded per TrOCR call.")
+    parser.add_argument("--debug-lines", action="store_true",
+                        help=f"Also write the line crops to {TEMP_LINE_DIR}/<image name>/.")
+    args = parser.parse_args()
 
-    print(f"Detected {len(line_images)} lines. Running OCR...")
-    full_text = []
-    for line_img in line_images:
-        try:
-            line_text = run_tr_ocr_on_line(line_img)
-            full_text.append(line_text)
-        except Exception as e:
-            print(f"Error on {line_img}: {e}")
+    filename = os.path.splitext(os.path.basename(args.image_path))[0]
+    debug_dir = os.path.join(TEMP_LINE_DIR, filename) if args.debug_lines else None
+
+    print("Extracting lines from original image...")
+    full_text = run_ocr(args.image_path, batch_size=args.batch_size, debug_dir=debug_dir)
+    print(f"Recognized {len(full_text)} lines.")
 
     combined = "\n".join(full_text)
 
-    filename = os.path.splitext(os.path.basename(INPUT_IMAGE_PATH))[0]
     output_file = f"OCR_outputs/trocr_output_{filename}_NEW.txt"
     with open(output_file, "w", encoding="utf-8") as f:
         f.write(combined)
 
-    print("[TrOCR] Done. Saved to trocr_output.txt")
+    print(f"[TrOCR] Done. Saved to {output_file}")
 
 if __name__ == "__main__":
     main()
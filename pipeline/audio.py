@@ -0,0 +1,75 @@
+import struct
+
+
+def _read_wav(path: str):
+    """
+    Returns (fmt chunk bytes, data chunk bytes) of a RIFF/WAVE file. Works for
+    PCM and IEEE float files alike, which the stdlib wave module does not.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError(f"Not a WAV file: {path}")
+
+    fmt = None
+    frames = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        (size,) = struct.unpack("<I", data[pos + 4:pos + 8])
+        body = data[pos + 8:pos + 8 + size]
+        if chunk_id == b"fmt ":
+            fmt = body
+        elif chunk_id == b"data":
+            frames = body
+        pos += 8 + size + (size & 1)
+
+    if fmt is None or frames is None:
+        raise ValueError(f"WAV file without fmt/data chunk: {path}")
+    return fmt, frames
+
+
+def concat_wav(part_paths, output_path: str) -> None:
+    """
+    Concatenates WAV files that share one format into output_path.
+    """
+    fmt = None
+    frames = []
+    for path in part_paths:
+        part_fmt, part_frames = _read_wav(path)
+        if fmt is None:
+            fmt = part_fmt
+        elif part_fmt != fmt:
+            raise ValueError(f"Audio format of {path} differs from the first segment.")
+        frames.append(part_frames)
+
+    if fmt is None:
+        raise ValueError("No audio segments to concatenate.")
+
+    data = b"".join(frames)
+    with open(output_path, "wb") as f:
+        f.write(b"RIFF")
+        f.write(struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data) + (len(data) & 1)))
+        f.write(b"WAVE")
+        f.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+        f.write(b"data" + struct.pack("<I", len(data)) + data)
+        if len(data) & 1:
+            f.write(b"\x00")
+
+
+def concat_mp3(part_paths, output_path: str) -> None:
+    """
+    MP3 streams are a sequence of self-contained frames, so segments can be
+    joined byte for byte.
+    """
+    with open(output_path, "wb") as out:
+        for path in part_paths:
+            with open(path, "rb") as f:
+                out.write(f.read())
+
+
+def concat_audio(part_paths, output_path: str) -> None:
+    if output_path.lower().endswith(".mp3"):
+        concat_mp3(part_paths, output_path)
+    else:
+        concat_wav(part_paths, output_path)
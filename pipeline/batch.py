@@ -0,0 +1,72 @@
+import logging
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class StagedPipeline:
+    """
+    Runs jobs through a fixed sequence of stages. Each stage has its own
+    bounded number of worker threads and passes finished jobs to the next
+    stage through a queue, so OCR of document N+1 overlaps with the LLM call
+    of document N and TTS of document N-1.
+
+    Jobs are dicts; a stage function updates its job in place. A job whose
+    stage raises gets job["error"] set and skips the remaining stages.
+    """
+
+    def __init__(self, stages):
+        """
+        Arguments:
+            stages: list of (name, function(job), number of workers)
+        """
+        self.stages = stages
+
+    def run(self, jobs):
+        queues = [queue.Queue() for _ in self.stages]
+        remaining = [workers for _, _, workers in self.stages]
+        lock = threading.Lock()
+        threads = []
+
+        def worker(index):
+            name, function, _ = self.stages[index]
+            while True:
+                job = queues[index].get()
+                if job is _STOP:
+                    break
+                start = time.time()
+                try:
+                    function(job)
+                except Exception as e:
+                    job["error"] = f"{name}: {e}"
+                    logging.error(f"[{name}] {job['input_path']} failed: {e}")
+                    continue
+                job.setdefault("times", {})[name] = time.time() - start
+                logging.info(f"[{name}] {job['input_path']} done in {job['times'][name]:.1f}s")
+                if index + 1 < len(self.stages):
+                    queues[index + 1].put(job)
+
+            # the last worker of a stage to finish shuts the next stage down
+            with lock:
+                remaining[index] -= 1
+                last = remaining[index] == 0
+            if last and index + 1 < len(self.stages):
+                for _ in range(self.stages[index + 1][2]):
+                    queues[index + 1].put(_STOP)
+
+        for index, (_, _, workers) in enumerate(self.stages):
+            for _ in range(workers):
+                thread = threading.Thread(target=worker, args=(index,), daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        for job in jobs:
+            queues[0].put(job)
+        for _ in range(self.stages[0][2]):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+        return jobs
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+
+from pipeline.stages import PROJECT_ROOT
+
+DEFAULT_CACHE_DIR = os.path.join(PROJECT_ROOT, '.cache', 'stages')
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cache_key(*parts) -> str:
+    """
+    Hashes JSON-serializable key parts (input digests, stage settings) into
+    one content address.
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Content-addressed store for stage results (OCR/LLM text, TTS audio).
+    Entries live under <root>/<stage>/<key[:2]>/<key><suffix>; a hit refreshes
+    the entry's mtime, and put() evicts least recently used entries once the
+    store grows past max_bytes.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, stage: str, key: str, suffix: str) -> str:
+        return os.path.join(self.root, stage, key[:2], key + suffix)
+
+    def _hit(self, path: str) -> bool:
+        if not os.path.isfile(path):
+            return False
+        os.utime(path)
+        return True
+
+    def _store(self, path: str, write) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def get_text(self, stage: str, key: str):
+        path = self._path(stage, key, ".txt")
+        if not self._hit(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put_text(self, stage: str, key: str, text: str) -> None:
+        self._store(self._path(stage, key, ".txt"), lambda f: f.write(text.encode("utf-8")))
+
+    def get_file(self, stage: str, key: str, dest_path: str) -> bool:
+        """
+        Copies a cached file to dest_path; returns False on a miss.
+        """
+        path = self._path(stage, key, os.path.splitext(dest_path)[1])
+        if not self._hit(path):
+            return False
+        os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+        shutil.copyfile(path, dest_path)
+        return True
+
+    def put_file(self, stage: str, key: str, src_path: str) -> None:
+        def write(f):
+            with open(src_path, "rb") as src:
+                shutil.copyfileobj(src, f)
+
+        self._store(self._path(stage, key, os.path.splitext(src_path)[1]), write)
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            for dirpath, _, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.endswith(".tmp"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    continue
+                total -= size
+                logging.info(f"Evicted cached result {os.path.relpath(path, self.root)}")
@@ -0,0 +1,178 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.pool import WorkerPool
+from pipeline.stages import STAGES, StageError
+
+if not hasattr(socket, "AF_UNIX"):
+    raise StageError("The pipeline daemon needs Unix domain sockets, which this platform does not provide; "
+                     "run main.py without --daemon.")
+
+# a per-user socket; only its owner may connect (mode 0600)
+DEFAULT_SOCKET_PATH = os.path.join(
+    os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"lecture-pipeline-{os.getuid()}.sock"
+)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                result = self.server.pool.run(request["stage"], **request.get("args", {}))
+                response = {"id": request.get("id"), "ok": True, "result": result}
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"id": None, "ok": False, "error": f"Malformed request: {e}"}
+            except StageError as e:
+                response = {"id": request.get("id"), "ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class PipelineDaemon(socketserver.ThreadingUnixStreamServer):
+    """
+    Long-lived dispatcher that owns one warm worker per virtualenv and serves
+    stage requests from any number of main.py runs over a Unix socket. The
+    socket is created with mode 0600, so other users of the machine cannot
+    make the workers read or write files on the owner's behalf.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, pool: WorkerPool):
+        _remove_stale_socket(socket_path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.pool = pool
+
+    def server_close(self):
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Removes the socket file a crashed daemon left behind; refuses to replace
+    a live daemon or anything that is not a socket.
+    """
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise StageError(f"{socket_path} exists and is not a socket.")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise StageError(f"A pipeline daemon is already listening on {socket_path}.")
+    finally:
+        probe.close()
+
+
+class DaemonClient:
+    """
+    Sends stage requests to a running PipelineDaemon. Each calling thread gets
+    its own connection, so concurrent requests reach the daemon's workers in
+    parallel. Has the same run()/close() interface as SubprocessRunner.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH):
+        self.socket_path = socket_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._stream()  # fail early if the daemon is not running
+
+    def _stream(self):
+        if not hasattr(self._local, "stream"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except OSError as e:
+                sock.close()
+                raise StageError(f"Could not connect to pipeline daemon at {self.socket_path}: {e}")
+            self._local.stream = sock.makefile("rw", encoding="utf-8", newline="\n")
+            self._local.next_id = 0
+            with self._lock:
+                self._connections.append((sock, self._local.stream))
+        return self._local.stream
+
+    def run(self, stage: str, **args):
+        stream = self._stream()
+        self._local.next_id += 1
+        try:
+            stream.write(json.dumps({"id": self._local.next_id, "stage": stage, "args": args}) + "\n")
+            stream.flush()
+            line = stream.readline()
+        except OSError as e:
+            raise StageError(f"Lost connection to pipeline daemon: {e}")
+        if not line:
+            raise StageError("Pipeline daemon closed the connection.")
+
+        try:
+            response = json.loads(line)
+        except ValueError as e:
+            raise RuntimeError(f"{stage}: malformed reply from pipeline daemon ({e}): {line[:200]!r}")
+        if not response.get("ok"):
+            raise StageError(response.get("error"))
+        return response.get("result")
+
+    def close(self):
+        with self._lock:
+            for sock, stream in self._connections:
+                stream.close()
+                sock.close()
+            self._connections = []
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    parser = argparse.ArgumentParser(description="Lecture Synthesizer pipeline daemon: keeps stage models loaded between documents.")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH,
+                        help="Unix socket to listen on; only the current user can connect to it")
+    parser.add_argument('--preload', nargs='*', default=[], choices=list(STAGES),
+                        help="Stages to warm up before accepting requests")
+    parser.add_argument('--ocr-workers', type=int, default=1,
+                        help="Number of warm OCR processes (pages of scanned PDFs are recognized in parallel)")
+    args = parser.parse_args()
+
+    pool = WorkerPool({"ocr": args.ocr_workers})
+    try:
+        pool.preload(args.preload)
+        with PipelineDaemon(args.socket, pool) as server:
+            logging.info(f"Pipeline daemon listening on {args.socket}")
+            server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Shutting down pipeline daemon.")
+    except StageError as e:
+        logging.error(str(e))
+        sys.exit(1)
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
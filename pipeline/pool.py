@@ -0,0 +1,131 @@
+import json
+import logging
+import queue
+import subprocess
+import threading
+
+from pipeline.stages import StageError, stage_paths
+
+
+class StageWorker:
+    """
+    A stage script started with `--serve` in its own virtualenv. The script
+    loads its models once and then answers requests over stdin/stdout (see
+    pipeline.worker), so every call after the first skips the cold start.
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.process = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        python, script = stage_paths(self.stage)
+        logging.info(f"Starting warm {self.stage} worker: {script}")
+        self.process = subprocess.Popen(
+            [python, script, "--serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self._read_message()  # blocks until models are loaded
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_started(self):
+        with self._lock:
+            if not self.is_alive():
+                self.start()
+
+    def call(self, **args):
+        with self._lock:
+            if not self.is_alive():
+                self.start()
+
+            self._next_id += 1
+            request = {"id": self._next_id, "args": args}
+            try:
+                self.process.stdin.write(json.dumps(request) + "\n")
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError) as e:
+                raise StageError(f"{self.stage} worker is not accepting requests: {e}")
+
+            response = self._read_message()
+            if not response.get("ok"):
+                raise StageError(f"{self.stage} worker failed: {response.get('error')}")
+            return response.get("result")
+
+    def _read_message(self) -> dict:
+        while True:
+            line = self.process.stdout.readline()
+            if not line:
+                raise StageError(f"{self.stage} worker exited with code {self.process.wait()}.")
+            try:
+                message = json.loads(line)
+            except ValueError:
+                message = None
+            if isinstance(message, dict):
+                return message
+            # library output printed before the worker took over stdout
+            logging.info(f"{self.stage} worker: {line.rstrip()}")
+
+    def close(self, timeout: float = 10.0):
+        if not self.is_alive():
+            return
+        try:
+            self.process.stdin.write(json.dumps({"op": "shutdown"}) + "\n")
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """
+    Keeps warm StageWorkers per stage (i.e. per virtualenv), started on first
+    use and reused for every later job. A stage gets one worker unless sizes
+    asks for more, e.g. WorkerPool({"ocr": 4}) runs up to four OCR jobs at
+    once in four processes. Has the same run()/close() interface as
+    SubprocessRunner.
+    """
+
+    def __init__(self, sizes=None):
+        self.sizes = dict(sizes or {})
+        self.workers = {}
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _idle_workers(self, stage: str) -> queue.Queue:
+        with self._lock:
+            if stage not in self._idle:
+                self.workers[stage] = [StageWorker(stage) for _ in range(max(1, self.sizes.get(stage, 1)))]
+                self._idle[stage] = queue.Queue()
+                for worker in self.workers[stage]:
+                    self._idle[stage].put(worker)
+            return self._idle[stage]
+
+    def run(self, stage: str, **args):
+        idle = self._idle_workers(stage)
+        worker = idle.get()
+        try:
+            return worker.call(**args)
+        finally:
+            idle.put(worker)
+
+    def preload(self, stages):
+        for stage in stages:
+            self._idle_workers(stage)
+            for worker in self.workers[stage]:
+                worker.ensure_started()
+
+    def close(self):
+        for workers in self.workers.values():
+            for worker in workers:
+                worker.close()
+        self.workers = {}
+        self._idle = {}
@@ -0,0 +1,100 @@
+import logging
+import os
+import subprocess
+import sys
+
+from pipeline.worker import STDIN_PATH
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# stage name -> (virtualenv directory, stage script)
+STAGES = {
+    "ocr": (".venv_ocr_craft", os.path.join("ocr", "trocr_craft.py")),
+    "llm": (".venv_ollama", os.path.join("nlp", "nlp_model.py")),
+    "chatterbox": (".venv_chatter", os.path.join("TTS", "chatterbox_audio.py")),
+    "elevenlabs_v2": (".venv_elevenlabs", os.path.join("TTS", "elevenlabs_audio.py")),
+    "dia": (".venv_dia", os.path.join("TTS", "Dia_audio.py")),
+}
+
+
+class StageError(Exception):
+    pass
+
+
+def venv_python(venv_name: str) -> str:
+    if sys.platform == "win32":
+        return os.path.join(PROJECT_ROOT, venv_name, 'Scripts', 'python.exe')
+    return os.path.join(PROJECT_ROOT, venv_name, 'bin', 'python')
+
+
+def stage_paths(stage: str):
+    """
+    Returns (python executable, script path) for a stage, checking both exist.
+    """
+    if stage not in STAGES:
+        raise StageError(f"Unknown stage: {stage}")
+
+    venv_name, script = STAGES[stage]
+    python = venv_python(venv_name)
+    script_path = os.path.join(PROJECT_ROOT, script)
+
+    if not os.path.exists(python):
+        raise StageError(f"{stage} Python executable not found at '{python}'. Please ensure {venv_name} is set up.")
+    if not os.path.exists(script_path):
+        raise StageError(f"{stage} script not found at '{script_path}'. Please ensure {os.path.basename(script)} exists.")
+    return python, script_path
+
+
+def _command_args(stage: str, args: dict):
+    """
+    Returns (argv, stdin text) for a one-shot stage call. Notes and lecture
+    scripts go through stdin since they can exceed the OS argv limit.
+    """
+    if stage == "ocr":
+        # a one-shot process inherits this process's OCR_QUANTIZE, so
+        # "quantize" needs no flag
+        if "engine" in args:
+            return ["--engine", args["engine"], args["image_path"]], None
+        return [args["image_path"]], None
+    if stage == "llm":
+        argv = [STDIN_PATH, args["ollama_model_name"], args["system_prompt_type"]]
+        if "max_chunk_tokens" in args:
+            argv.append(str(args["max_chunk_tokens"]))
+        return argv, args["notes"]
+    argv = ["--text-file", STDIN_PATH, "--output", args["output"]]
+    if args.get("voice_prompt"):
+        argv += ["--voice-prompt", args["voice_prompt"]]
+    return argv, args["text"]
+
+
+class SubprocessRunner:
+    """
+    Runs every stage call in a fresh interpreter of the stage's virtualenv.
+    Models are reloaded on each call; use a WorkerPool or the pipeline daemon
+    to keep them warm.
+    """
+
+    def run(self, stage: str, **args) -> str:
+        python, script = stage_paths(stage)
+        argv, stdin_text = _command_args(stage, args)
+        try:
+            result = subprocess.run(
+                [python, script] + argv,
+                input=stdin_text,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                encoding="utf-8",
+                check=True
+            )
+        except FileNotFoundError as e:
+            raise StageError(f"{stage} execution failed: {e}. Ensure the virtual environment and script exist.")
+        except subprocess.CalledProcessError as e:
+            raise StageError(f"{stage} script returned error code {e.returncode}. Stderr: {e.stderr.strip()}")
+
+        if result.stderr:
+            logging.info(f"{stage} Subprocess Stderr: {result.stderr.strip()}")
+        return result.stdout.strip()
+
+    def close(self):
+        pass
@@ -0,0 +1,110 @@
+import glob
+import json
+import logging
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pipeline.audio import concat_audio
+from pipeline.stages import PROJECT_ROOT, StageError, stage_paths
+from pipeline.worker import STDIN_PATH
+
+SEGMENTS_DIR = os.path.join(PROJECT_ROOT, 'step_outputs', 'tts_segments')
+
+
+def stream_lecture_segments(notes: str, ollama_model_name: str, system_prompt_type: str):
+    """
+    Runs nlp_model.py in --stream mode and yields lecture units as the LLM
+    produces them.
+    """
+    python, script = stage_paths("llm")
+    process = subprocess.Popen(
+        [python, script, "--stream", STDIN_PATH, ollama_model_name, system_prompt_type],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+    )
+    try:
+        # the script reads all of stdin before it prints its first segment
+        try:
+            process.stdin.write(notes)
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            segment = json.loads(line)
+            if segment.startswith("[ERROR]"):
+                raise StageError(f"Lecture generation failed: {segment}")
+            yield segment
+    except BaseException:
+        process.kill()
+        raise
+    finally:
+        process.stdout.close()
+        process.wait()
+
+    if process.returncode != 0:
+        raise StageError(f"llm script returned error code {process.returncode}.")
+
+
+def synthesize_segments(segments, tts_engine: str, final_audio_path: str, runner) -> str:
+    """
+    Hands every unit to the TTS stage as soon as it arrives, while the next
+    units are still being generated, then joins the parts into final_audio_path.
+    Returns the full lecture script.
+    """
+    base_name, ext = os.path.splitext(os.path.basename(final_audio_path))
+    parts_dir = os.path.join(SEGMENTS_DIR, base_name)
+    os.makedirs(parts_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(parts_dir, "part_*")) + glob.glob(os.path.join(parts_dir, "voice_prompt.*")):
+        os.remove(stale)
+    # Dia picks a random voice per call; the first segment records a voice
+    # prompt that every later segment of this lecture is generated from
+    extra = {"voice_prompt": os.path.join(parts_dir, "voice_prompt.wav")} if tts_engine == "dia" else {}
+
+    start = time.time()
+
+    def synthesize(index, segment):
+        part_path = os.path.join(parts_dir, f"part_{index:04d}{ext}")
+        runner.run(tts_engine, text=segment, output=part_path, **extra)
+        if index == 0:
+            logging.info(f"First audio segment ready after {time.time() - start:.1f}s: {part_path}")
+        return part_path
+
+    script_parts = []
+    futures = []
+    checked = 0
+    # a single TTS worker serves the segments in order; the LLM keeps streaming meanwhile
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        try:
+            for index, segment in enumerate(segments):
+                # stop reading the LLM as soon as a segment failed to synthesize
+                while checked < len(futures) and futures[checked].done():
+                    futures[checked].result()
+                    checked += 1
+                script_parts.append(segment)
+                futures.append(executor.submit(synthesize, index, segment))
+            part_paths = [future.result() for future in futures]
+        except BaseException:
+            # don't synthesize the queued segments of a lecture that failed
+            for future in futures:
+                future.cancel()
+            if hasattr(segments, "close"):
+                segments.close()
+            raise
+
+    if not part_paths:
+        raise StageError("Lecture generation returned no text.")
+
+    try:
+        concat_audio(part_paths, final_audio_path)
+    except (OSError, ValueError) as e:
+        raise StageError(f"Failed to join audio segments: {e}")
+    logging.info(f"Joined {len(part_paths)} audio segments in {time.time() - start:.1f}s.")
+
+    return "\n\n".join(script_parts)
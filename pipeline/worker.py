@@ -0,0 +1,68 @@
+import json
+import sys
+import traceback
+
+ERROR_PREFIX = "[ERROR]"
+STDIN_PATH = "-"
+
+
+def read_text(path: str) -> str:
+    """
+    Reads a stage's text input from a file, or from stdin when path is "-".
+    Large notes and lecture scripts are handed over this way instead of
+    through argv, which is limited to a few hundred kilobytes.
+    """
+    if path == STDIN_PATH:
+        return sys.stdin.buffer.read().decode("utf-8")
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def write_message(stream, message: dict) -> None:
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+def serve(handler, stdin=None, stdout=None) -> None:
+    """
+    Runs a stage script as a warm worker.
+
+    The caller has already loaded its models at import time. Requests arrive as
+    one JSON object per line on stdin ({"id": ..., "args": {...}}) and each one
+    is answered with one JSON line on stdout ({"id": ..., "ok": ..., "result"
+    or "error": ...}). Anything the handler prints is redirected to stderr so
+    stdout carries protocol messages only.
+    """
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    sys.stdout = sys.stderr
+
+    write_message(stdout, {"ready": True})
+
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            write_message(stdout, {"id": None, "ok": False, "error": f"Malformed request: {e}"})
+            continue
+
+        request_id = request.get("id")
+        if request.get("op") == "shutdown":
+            write_message(stdout, {"id": request_id, "ok": True, "result": None})
+            break
+
+        try:
+            result = handler(**request.get("args", {}))
+        except (Exception, SystemExit) as e:
+            traceback.print_exc(file=sys.stderr)
+            write_message(stdout, {"id": request_id, "ok": False, "error": str(e) or type(e).__name__})
+            continue
+
+        if isinstance(result, str) and result.startswith(ERROR_PREFIX):
+            write_message(stdout, {"id": request_id, "ok": False, "error": result})
+        else:
+            write_message(stdout, {"id": request_id, "ok": True, "result": result})
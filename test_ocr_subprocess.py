@@ -30,10 +30,10 @@ def run_ocr_test(image_path: str):
         sys.exit(1)
 
     try:
-        logging.info(f"Executing command: {ocr_env_python} {trocr_script} {image_path}")
+        logging.info(f"Executing command: {ocr_env_python} {trocr_script} --engine trocr {image_path}")
         
         result = subprocess.run(
-            [ocr_env_python, trocr_script, image_path],
+            [ocr_env_python, trocr_script, "--engine", "trocr", image_path],
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
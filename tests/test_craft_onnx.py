@@ -0,0 +1,62 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ocr"))
+from craft_text_detector import Craft, image_utils, torch_utils
+from craft_text_detector.onnx_utils import CRAFTNET_ONNX_PATH, REFINENET_ONNX_PATH
+
+TEST_IMAGES = [
+    os.path.join(PROJECT_ROOT, "OCR_test_documents", name)
+    for name in ("handwritten1.png", "printed1.png", "whiteboard1.jpg")
+]
+MAX_SCORE_DIFF = 1e-3
+
+
+def score_maps(craft, x):
+    """
+    Returns the text score map and the refined link score map of one image.
+    """
+    with torch_utils.no_grad():
+        y, feature = craft.craft_net(x)
+        y_refiner = craft.refine_net(y, feature)
+    return y[0, :, :, 0].cpu().numpy(), y_refiner[0, :, :, 0].cpu().numpy()
+
+
+def test_onnx_backend_matches_torch():
+    """
+    The ONNX Runtime backend must reproduce the torch score maps and boxes.
+    Needs onnxruntime and graphs exported with ocr/export_craft_onnx.py.
+    """
+    missing = [str(path) for path in (CRAFTNET_ONNX_PATH, REFINENET_ONNX_PATH) if not os.path.isfile(path)]
+    if missing:
+        pytest.skip(f"ONNX graphs not exported: {', '.join(missing)}")
+
+    torch_craft = Craft(output_dir=None, backend="torch")
+    onnx_craft = Craft(output_dir=None, backend="onnx")
+
+    for image_path in TEST_IMAGES:
+        image = image_utils.read_image(image_path)
+        img_resized, _, _ = image_utils.resize_aspect_ratio(image, 1280, interpolation=cv2.INTER_LINEAR)
+        x = torch_utils.from_numpy(image_utils.normalizeMeanVariance(img_resized)).permute(2, 0, 1).unsqueeze(0)
+
+        for name, expected, result in zip(("text", "link"), score_maps(torch_craft, x), score_maps(onnx_craft, x)):
+            diff = np.abs(expected - result).max()
+            assert diff <= MAX_SCORE_DIFF, f"{image_path}: {name} scores differ by {diff}"
+
+        expected = torch_craft.detect_text(image_path)
+        result = onnx_craft.detect_text(image_path)
+        assert len(result["boxes"]) == len(expected["boxes"]), f"{image_path}: different number of boxes"
+        for box, expected_box in zip(result["boxes"], expected["boxes"]):
+            assert np.allclose(box, expected_box, atol=2.0), f"{image_path}: {box} != {expected_box}"
+        print(f"{os.path.basename(image_path)}: ONNX matches torch ({len(result['boxes'])} boxes)")
+
+
+if __name__ == "__main__":
+    test_onnx_backend_matches_torch()
@@ -0,0 +1,64 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr"))
+from craft_text_detector.predict import get_prediction, get_prediction_tiled
+
+TILE_SIZE = 640
+TILE_OVERLAP = 256
+
+
+class LocalScoreNet(torch.nn.Module):
+    """
+    Stand-in for CraftNet with the same input and output layout, whose scores
+    at a pixel depend only on a few pixels around it. Tiling must then
+    reproduce the untiled score maps exactly, so any difference comes from
+    how the tiles are cut and stitched.
+    """
+
+    def forward(self, x):
+        ink = -x.mean(dim=1, keepdim=True)
+        half = torch.nn.functional.avg_pool2d(ink, 2)
+        text = torch.sigmoid(2 * torch.nn.functional.avg_pool2d(half, 5, stride=1, padding=2))
+        link = torch.sigmoid(2 * torch.nn.functional.avg_pool2d(half, 9, stride=1, padding=4))
+        return torch.cat([text, link], dim=1).permute(0, 2, 3, 1), None
+
+
+def make_page(height=1056, width=1600):
+    """
+    White RGB page with lines of printed text, several of them crossing the
+    seams between tiles.
+    """
+    page = np.full((height, width, 3), 255, dtype=np.uint8)
+    for n, y in enumerate(range(60, height - 20, 70)):
+        cv2.putText(page, f"line {n} crosses the tile seams of this synthetic page " * 2, (20 + 15 * n, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.1, (0, 0, 0), 2)
+    return page
+
+
+def test_tiled_heatmaps_match_untiled():
+    page = make_page()
+    assert max(page.shape[:2]) > TILE_SIZE
+    net = LocalScoreNet().eval()
+
+    untiled = get_prediction(page, net, long_size=max(page.shape[:2]))
+    tiled = get_prediction_tiled(page, net, tile_size=TILE_SIZE, tile_overlap=TILE_OVERLAP, tile_batch_size=2)
+
+    for name in ("text_score_heatmap", "link_score_heatmap"):
+        expected, result = untiled["heatmaps"][name], tiled["heatmaps"][name]
+        assert result.shape == expected.shape, f"{name}: {result.shape} != {expected.shape}"
+        diff = np.abs(result.astype(np.int16) - expected.astype(np.int16)).max()
+        assert diff <= 1, f"{name}: tiled and untiled heatmaps differ by {diff}"
+
+    assert len(tiled["boxes"]) == len(untiled["boxes"]) > 0, "tiling changed the detected boxes"
+    for box, expected_box in zip(tiled["boxes"], untiled["boxes"]):
+        assert np.allclose(box, expected_box, atol=1.0), f"{box} != {expected_box}"
+    print(f"Tiled heatmaps match untiled ones ({len(tiled['boxes'])} boxes).")
+
+
+if __name__ == "__main__":
+    test_tiled_heatmaps_match_untiled()
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "ocr"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "Evaluation", "Performance"))
+import craft_text_detector.craft_utils as craft_utils
+from craft_reference import make_score_maps, reference_getDetBoxes_core, reference_getPoly_core
+
+
+def test_getDetBoxes_core_matches_reference():
+    """
+    The ROI-based getDetBoxes_core must return exactly the boxes of the
+    original full-image implementation.
+    """
+    for seed in range(5):
+        textmap, linkmap = make_score_maps(seed)
+        args = (textmap, linkmap, 0.7, 0.4, 0.4)
+
+        expected_det, expected_labels, expected_mapper = reference_getDetBoxes_core(*args)
+        det, labels, mapper = craft_utils.getDetBoxes_core(*args)
+
+        assert mapper == expected_mapper, f"seed {seed}: different components kept"
+        assert np.array_equal(labels, expected_labels)
+        assert len(det) == len(expected_det)
+        for box, expected_box in zip(det, expected_det):
+            assert np.array_equal(box, expected_box), f"seed {seed}: {box} != {expected_box}"
+    print("getDetBoxes_core matches the reference implementation.")
+
+
+def test_getPoly_core_matches_reference():
+    """
+    The vectorized getPoly_core must return exactly the polygons of the
+    original column-by-column implementation.
+    """
+    n_polys = 0
+    for seed in range(5):
+        textmap, linkmap = make_score_maps(seed, n_words=60)
+        boxes, labels, mapper = craft_utils.getDetBoxes_core(textmap, linkmap, 0.7, 0.4, 0.4)
+
+        expected = reference_getPoly_core(boxes, labels, mapper, linkmap)
+        polys = craft_utils.getPoly_core(boxes, labels, mapper, linkmap)
+
+        assert len(polys) == len(expected)
+        for poly, expected_poly in zip(polys, expected):
+            if expected_poly is None:
+                assert poly is None, f"seed {seed}: unexpected polygon"
+                continue
+            assert poly is not None and np.array_equal(poly, expected_poly), f"seed {seed}: {poly} != {expected_poly}"
+            n_polys += 1
+    assert n_polys > 0, "no polygons were generated; the test maps do not exercise getPoly_core"
+    print(f"getPoly_core matches the reference implementation ({n_polys} polygons).")
+
+
+if __name__ == "__main__":
+    test_getDetBoxes_core_matches_reference()
+    test_getPoly_core_matches_reference()
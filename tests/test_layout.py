@@ -0,0 +1,48 @@
+import math
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr"))
+import layout
+
+
+def make_page(skew_degrees, columns=(50, 900), n_lines=4, n_words=5, seed=0):
+    """
+    Builds word boxes of a page with the given columns, rotated by
+    skew_degrees and shuffled, plus the (column, line, word) of each box.
+    """
+    theta = math.radians(skew_degrees)
+    rotation = np.array([[math.cos(theta), -math.sin(theta)], [math.sin(theta), math.cos(theta)]])
+    boxes, truth = [], []
+    for column, x0 in enumerate(columns):
+        for line in range(n_lines):
+            for word in range(n_words):
+                x, y = x0 + word * 130, 100 + line * 60
+                corners = np.array([[x, y], [x + 110, y], [x + 110, y + 30], [x, y + 30]], dtype=np.float64)
+                boxes.append((corners @ rotation.T).astype(np.float32))
+                truth.append((column, line, word))
+    order = np.random.default_rng(seed).permutation(len(boxes))
+    return [boxes[i] for i in order], [truth[i] for i in order]
+
+
+def test_group_lines_reading_order():
+    for skew_degrees in (0, 4, -7):
+        boxes, truth = make_page(skew_degrees)
+        lines, skew = layout.group_lines(boxes)
+
+        assert abs(math.degrees(skew) - skew_degrees) < 0.1, f"estimated skew {math.degrees(skew):.2f}"
+        assert len(lines) == 8, f"skew {skew_degrees}: {len(lines)} lines"
+        expected = sorted(truth)
+        got = [truth[i] for line in lines for i in line.boxes]
+        assert got == expected, f"skew {skew_degrees}: wrong reading order"
+
+        image = np.zeros((800, 2000, 3), dtype=np.uint8)
+        crops = layout.line_crops(image, lines, skew)
+        assert all(crop.shape[0] < 60 for crop in crops), "a crop spans more than one line"
+    print("group_lines recovers lines and columns in reading order.")
+
+
+if __name__ == "__main__":
+    test_group_lines_reading_order()
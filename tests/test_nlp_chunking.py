@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "nlp"))
+import nlp_model
+
+
+def test_split_notes_on_page_and_section_boundaries():
+    pages = [
+        f"# Page {page}\n" + "\n\n".join(f"Paragraph {page}.{paragraph} " + "word " * 150 for paragraph in range(6))
+        for page in range(5)
+    ]
+    notes = nlp_model.PAGE_BREAK.join(pages)
+
+    chunks = nlp_model.split_notes(notes, max_tokens=1500)
+    assert [chunk.split("\n", 1)[0] for chunk in chunks] == [f"# Page {page}" for page in range(5)], "chunks do not start at pages"
+    assert all(nlp_model.estimate_tokens(chunk) <= 1500 for chunk in chunks), "a chunk exceeds the token budget"
+
+    # a section longer than a chunk is split at paragraphs
+    chunks = nlp_model.split_notes(pages[0], max_tokens=500)
+    assert len(chunks) > 1 and all(nlp_model.estimate_tokens(chunk) <= 500 for chunk in chunks)
+    assert all(chunk.startswith(("# Page", "Paragraph")) for chunk in chunks), "a paragraph was cut"
+
+    # short notes stay in one chunk
+    assert nlp_model.split_notes("INTRODUCTION\nfoo\n2. Second\nbar", max_tokens=1500) == ["INTRODUCTION\nfoo\n\n2. Second\nbar"]
+    print("split_notes keeps pages and sections together within the token budget.")
+
+
+if __name__ == "__main__":
+    test_split_notes_on_page_and_section_boundaries()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import threading
+
+import pypdfium2 as pdfium
+from PIL import Image
+from PyPDF2 import PdfReader, PdfWriter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr"))
+from pdf_parser import analyze_and_save, render_page
+
+
+def test_render_page_applies_rotation():
+    """
+    A scan stored upright but shown rotated by /Rotate must reach OCR the way
+    a viewer shows it, not as the embedded image.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        scan = Image.new("L", (400, 200), 255)
+        scan.paste(0, (0, 0, 100, 200))  # dark band on the left edge
+        scan_path = os.path.join(tmp, "scan.pdf")
+        scan.save(scan_path, resolution=72)
+
+        writer = PdfWriter()
+        for page in PdfReader(scan_path).pages:
+            writer.add_page(page.rotate(90))
+        rotated_path = os.path.join(tmp, "rotated.pdf")
+        with open(rotated_path, "wb") as f:
+            writer.write(f)
+
+        document = pdfium.PdfDocument(rotated_path)
+        try:
+            image_path = render_page(document, 1, tmp, dpi=72)
+        finally:
+            document.close()
+        with Image.open(image_path) as rendered:
+            rendered = rendered.convert("L")
+            assert rendered.size == (200, 400), f"page rendered as {rendered.size}, expected (200, 400)"
+            # rotated clockwise, the left band becomes the top one
+            assert rendered.getpixel((100, 20)) < 128 and rendered.getpixel((100, 380)) > 128
+    print("render_page draws scanned pages as displayed.")
+
+
+def test_failed_page_cancels_the_rest():
+    """
+    Pages are rendered only as OCR workers free up, the first failure stops
+    the remaining pages, and no rendered page is left behind.
+    """
+    calls, seen = [], []
+    lock = threading.Lock()
+
+    def failing_ocr(image_path):
+        with lock:
+            calls.append(image_path)
+            seen.append(os.path.dirname(image_path))
+        raise RuntimeError("OCR failed")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "scanned_failure_test.pdf")
+        pages = [Image.new("L", (100, 100), 255) for _ in range(12)]
+        pages[0].save(pdf_path, save_all=True, append_images=pages[1:])
+
+        try:
+            analyze_and_save(pdf_path, ocr_image=failing_ocr, max_workers=2)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("the OCR failure was not re-raised")
+
+    assert len(calls) <= 4, f"{len(calls)} of 12 pages were OCRed after the first failure"
+    assert not any(os.path.exists(directory) for directory in seen), "rendered pages were left behind"
+    print(f"A failed page stopped the PDF after {len(calls)} OCR calls.")
+
+
+if __name__ == "__main__":
+    test_render_page_applies_rotation()
+    test_failed_page_cancels_the_rest()
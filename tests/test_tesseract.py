@@ -1,9 +1,28 @@
 import os
-from ocr.Tesseract import run_tesseract_ocr
+from ocr.Tesseract import run_tesseract_batch, run_tesseract_ocr
 
 input_folder = "OCR_test_documents"
 
-for filename in os.listdir(input_folder):
-    if filename.lower().endswith((".png", ".jpg", ".jpeg", ".webp")):
-        image_path = os.path.join(input_folder, filename)
-        run_tesseract_ocr(image_path)
\ No newline at end of file
+
+def test_run_tesseract_ocr():
+    for filename in os.listdir(input_folder):
+        if filename.lower().endswith((".png", ".jpg", ".jpeg", ".webp")):
+            image_path = os.path.join(input_folder, filename)
+            run_tesseract_ocr(image_path)
+
+
+def test_run_tesseract_batch():
+    image_paths = [
+        os.path.join(input_folder, filename)
+        for filename in sorted(os.listdir(input_folder))
+        if filename.lower().endswith((".png", ".jpg", ".jpeg", ".webp"))
+    ]
+    results = run_tesseract_batch(image_paths)
+    assert [result["name"] for result in results] == [
+        os.path.splitext(os.path.basename(path))[0] for path in image_paths
+    ], "batch results are not in page order"
+
+
+if __name__ == "__main__":
+    test_run_tesseract_ocr()
+    test_run_tesseract_batch()
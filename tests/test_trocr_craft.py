@@ -6,5 +6,5 @@ input_folder = "OCR_test_documents"
 for filename in os.listdir(input_folder):
     if filename.lower().endswith((".png", ".jpg", ".jpeg", ".webp")):
         image_path = os.path.join(input_folder, filename)
-        text = run_ocr(image_path)
+        text = run_ocr(image_path, engine="trocr")
         print(text)